@@ -1,29 +1,74 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g
 from flask_cors import CORS
 import joblib
 import pandas as pd
 import numpy as np
 import os
 import sys
+import warnings
 from datetime import datetime
+from functools import lru_cache
 
+try:
+    import orjson
+    from flask.json.provider import JSONProvider
+except ImportError:  # orjson not installed or Flask < 2.2
+    orjson = None
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.preprocess import CrimeDataPreprocessor
-from utils.grid_classifier_railway import GridClassifier
+from utils.grid_classifier_railway import GridClassifier, RiskZone, RISK_ZONE_LABELS, zone_to_string
+from utils.prediction_batcher import PredictionBatcher
+from utils.forest_predictor import ForestPredictor
+
+# Single-row features are passed to the model as plain arrays rather than DataFrames
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+if orjson is not None:
+    class ORJSONProvider(JSONProvider):
+        """Serialize responses with orjson, which also handles numpy scalars and arrays"""
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, option=self.option).decode()
+        
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+        
+        def response(self, *args, **kwargs):
+            # Hand orjson's bytes straight to the response, skipping the str round trip
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(
+                orjson.dumps(obj, option=self.option | orjson.OPT_APPEND_NEWLINE),
+                mimetype='application/json'
+            )
+    
+    app.json = ORJSONProvider(app)
+
+# Zone names indexed by RiskZone codes, for mapping whole arrays of codes at once
+ZONE_LABELS = np.array(RISK_ZONE_LABELS, dtype=object)
+
+# Grid zones where /live_safety_check answers from the grid alone by default
+ML_OPTIONAL_ZONES = frozenset((RiskZone.SAFE, RiskZone.LOW_RISK))
+
 # Global variables for model and preprocessor
 model = None
+forest = None
 preprocessor = None
 grid_classifier = None
+prediction_batcher = None
+READY = False  # Set once at startup: model and fitted preprocessor are loaded
+
+# Milliseconds to wait for concurrent single-row predictions to batch together (0 disables)
+PREDICTION_BATCH_WINDOW_MS = float(os.environ.get('PREDICTION_BATCH_WINDOW_MS', 5))
 
 def load_model_and_preprocessor():
-    """Load the trained model and preprocessor"""
-    global model, preprocessor, grid_classifier
+    """Load the trained model and preprocessor, returning whether predictions can be served"""
+    global model, forest, preprocessor, grid_classifier, prediction_batcher, READY
     
     try:
         print("Starting to load models...")
@@ -58,7 +103,8 @@ def load_model_and_preprocessor():
         for model_path in possible_model_paths:
             if os.path.exists(model_path):
                 try:
-                    model = joblib.load(model_path)
+                    # Memory-map the tree arrays so forked workers share one copy via the page cache
+                    model = joblib.load(model_path, mmap_mode='r')
                     print(f"✅ Model loaded from {model_path}")
                     break
                 except Exception as e:
@@ -68,6 +114,14 @@ def load_model_and_preprocessor():
         if model is None:
             print("❌ Model could not be loaded from any path")
         
+        # Score the trees directly (compiled when Numba is installed), same results as predict_proba
+        forest = ForestPredictor(model) if model is not None else None
+        
+        # Coalesce concurrent single-row predictions into one model call
+        prediction_batcher = None
+        if forest is not None and PREDICTION_BATCH_WINDOW_MS > 0:
+            prediction_batcher = PredictionBatcher(forest, max_wait=PREDICTION_BATCH_WINDOW_MS / 1000)
+        
         # Load preprocessor
         preprocessor = None
         for preprocessor_path in possible_preprocessor_paths:
@@ -89,13 +143,21 @@ def load_model_and_preprocessor():
         for data_path in possible_data_paths:
             if os.path.exists(data_path):
                 try:
-                    crime_data = pd.read_csv(data_path)
                     grid_classifier = GridClassifier(grid_size=0.01)  # 1.1 km grids
-                    grid_summary = grid_classifier.create_grid(crime_data)
+                    
+                    # Reuse the grid cached next to the model unless the crime data changed
+                    grid_cache_path = os.path.join(os.path.dirname(os.path.dirname(data_path)), 'model', 'grid.npz')
+                    if not grid_classifier.load_grid(grid_cache_path, source_path=data_path):
+                        crime_data = pd.read_csv(data_path)
+                        grid_classifier.create_grid(crime_data)
+                        try:
+                            grid_classifier.save_grid(grid_cache_path)
+                        except OSError as e:
+                            print(f"Could not cache grid at {grid_cache_path}: {e}")
+                    
+                    grid_summary = grid_classifier._get_grid_summary()
                     print(f"✅ Grid classifier initialized with {grid_summary['total_grids']} grids")
-                    print(f"High risk zones: {grid_summary['high_risk_grids']}")
-                    print(f"Medium risk zones: {grid_summary['medium_risk_grids']}")
-                    print(f"Low risk zones: {grid_summary['low_risk_grids']}")
+                    print(f"Risk zone distribution: {grid_summary['risk_zone_distribution']}")
                     break
                 except Exception as e:
                     print(f"❌ Failed to initialize grid classifier from {data_path}: {e}")
@@ -116,8 +178,30 @@ def load_model_and_preprocessor():
     except Exception as e:
         print(f"❌ Error in load_model_and_preprocessor: {e}")
         model = None
+        forest = None
         preprocessor = None
         grid_classifier = None
+        prediction_batcher = None
+    
+    READY = model is not None and preprocessor is not None and preprocessor.is_fitted
+    return READY
+
+def _predict_one(features):
+    """Return (predicted class, class probabilities) for a single feature row"""
+    if prediction_batcher is not None:
+        proba = prediction_batcher.predict_proba(features)
+    else:
+        proba = forest.predict_proba(features)[0]
+    
+    # Same rule RandomForestClassifier.predict applies to the probabilities
+    return model.classes_[proba.argmax()], proba
+
+def _request_time():
+    """Return (now, ISO timestamp, date string), read from the clock once per request"""
+    if 'request_time' not in g:
+        now = datetime.now()
+        g.request_time = (now, now.isoformat(), now.strftime('%Y-%m-%d'))
+    return g.request_time
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -127,7 +211,7 @@ def health_check():
         'model_loaded': model is not None,
         'preprocessor_loaded': preprocessor is not None and preprocessor.is_fitted,
         'grid_classifier_loaded': grid_classifier is not None,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': _request_time()[1]
     })
 
 @app.route('/predict', methods=['POST'])
@@ -170,33 +254,23 @@ def predict_safety():
             return jsonify({'error': 'Severity must be between 1 and 5'}), 400
         
         # Check if model and preprocessor are loaded
-        if model is None or preprocessor is None or not preprocessor.is_fitted:
+        if not READY:
             return jsonify({
                 'error': 'Model or preprocessor not loaded. Please ensure the model is trained.'
             }), 500
         
-        # Create input DataFrame
-        input_data = pd.DataFrame([{
-            'Crime_ID': 'prediction_request',
-            'Crime_Type': crime_type,
-            'Location': 'Prediction Location',
-            'Latitude': lat,
-            'Longitude': lon,
-            'Date': datetime.now().strftime('%Y-%m-%d'),
-            'Time': time,
-            'Severity': severity,
-            'Police_Station': 'Unknown PS'
-        }])
-        
-        # Preprocess input data
-        features = preprocessor.transform(input_data)
+        _, now_iso, today_str = _request_time()
+        
+        # Preprocess input directly into a feature row (no DataFrame on the hot path)
+        features = preprocessor.transform_one(
+            lat, lon, time, severity, crime_type, today_str
+        )
         
         # Make prediction
-        prediction = model.predict(features)[0]
-        prediction_proba = model.predict_proba(features)[0]
+        prediction, prediction_proba = _predict_one(features)
         
-        # Get confidence score
-        confidence = max(prediction_proba)
+        # Round all class probabilities at once; confidence is the top one
+        rounded_proba = np.round(prediction_proba, 3).tolist()
         
         # Determine safety status
         safety_status = 'safe' if prediction == 0 else 'risky'
@@ -204,9 +278,9 @@ def predict_safety():
         # Create response
         response = {
             'prediction': safety_status,
-            'confidence': round(confidence, 3),
-            'risk_score': round(prediction_proba[1], 3),  # Probability of being risky
-            'safe_score': round(prediction_proba[0], 3),  # Probability of being safe
+            'confidence': max(rounded_proba),
+            'risk_score': rounded_proba[1],  # Probability of being risky
+            'safe_score': rounded_proba[0],  # Probability of being safe
             'input_data': {
                 'latitude': lat,
                 'longitude': lon,
@@ -214,7 +288,7 @@ def predict_safety():
                 'severity': severity,
                 'crime_type': crime_type
             },
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso
         }
         
         return jsonify(response)
@@ -223,6 +297,52 @@ def predict_safety():
         print(f"Error in prediction: {e}")
         return jsonify({'error': f'Prediction failed: {str(e)}'}), 500
 
+BATCH_REQUIRED_FIELDS = ['latitude', 'longitude', 'time', 'severity', 'crime_type']
+
+def _parse_batch_locations(locations):
+    """
+    Convert /predict_batch locations into typed columns
+    
+    Returns:
+        tuple: ((latitudes, longitudes, severities, crime_types, times), None), or
+            (None, error message) naming the first invalid location
+    """
+    try:
+        latitudes = np.asarray([location['latitude'] for location in locations], dtype=np.float64)
+        longitudes = np.asarray([location['longitude'] for location in locations], dtype=np.float64)
+        severities = np.asarray([location['severity'] for location in locations], dtype=np.int64)
+        crime_types = [str(location['crime_type']) for location in locations]
+        times = [str(location['time']) for location in locations]
+        if latitudes.ndim == longitudes.ndim == severities.ndim == 1:
+            return (latitudes, longitudes, severities, crime_types, times), None
+    except (KeyError, ValueError, TypeError, OverflowError):
+        pass
+    
+    # Some location is malformed: convert item by item to report which one and why
+    n_locations = len(locations)
+    latitudes = np.empty(n_locations, dtype=np.float64)
+    longitudes = np.empty(n_locations, dtype=np.float64)
+    severities = np.empty(n_locations, dtype=np.int64)
+    crime_types = [None] * n_locations
+    times = [None] * n_locations
+    
+    for i, location in enumerate(locations):
+        missing_fields = [field for field in BATCH_REQUIRED_FIELDS if field not in location]
+        
+        if missing_fields:
+            return None, f'Location {i}: Missing required fields: {missing_fields}'
+        
+        try:
+            crime_types[i] = str(location['crime_type'])
+            latitudes[i] = float(location['latitude'])
+            longitudes[i] = float(location['longitude'])
+            times[i] = str(location['time'])
+            severities[i] = int(location['severity'])
+        except (ValueError, TypeError, OverflowError) as e:
+            return None, f'Location {i}: Invalid data types: {str(e)}'
+    
+    return (latitudes, longitudes, severities, crime_types, times), None
+
 @app.route('/predict_batch', methods=['POST'])
 def predict_batch():
     """Predict safety for multiple locations"""
@@ -242,68 +362,69 @@ def predict_batch():
             return jsonify({'error': 'Batch size too large. Maximum 100 locations.'}), 400
         
         # Check if model and preprocessor are loaded
-        if model is None or preprocessor is None or not preprocessor.is_fitted:
+        if not READY:
             return jsonify({
                 'error': 'Model or preprocessor not loaded. Please ensure the model is trained.'
             }), 500
         
-        # Prepare batch data
-        batch_data = []
-        for i, location in enumerate(locations):
-            required_fields = ['latitude', 'longitude', 'time', 'severity', 'crime_type']
-            missing_fields = [field for field in required_fields if field not in location]
-            
-            if missing_fields:
-                return jsonify({
-                    'error': f'Location {i}: Missing required fields: {missing_fields}'
-                }), 400
+        # Convert every field as a whole column, then validate ranges with array masks
+        columns, error = _parse_batch_locations(locations)
+        if error:
+            return jsonify({'error': error}), 400
+        latitudes, longitudes, severities, crime_types, times = columns
+        
+        for values, low, high, message in (
+            (latitudes, -90, 90, 'Latitude must be between -90 and 90'),
+            (longitudes, -180, 180, 'Longitude must be between -180 and 180'),
+            (severities, 1, 5, 'Severity must be between 1 and 5')
+        ):
+            # NaN fails both comparisons, so it is reported as out of range too
+            out_of_range = np.flatnonzero(~((values >= low) & (values <= high)))
+            if out_of_range.size:
+                return jsonify({'error': f'Location {out_of_range[0]}: {message}'}), 400
+        
+        # Build the feature matrix straight from the typed columns
+        features = preprocessor.transform_many(
+            latitudes, longitudes, times, severities, crime_types, _request_time()[2]
+        )
+        
+        # Make predictions: one model call, classes derived as RandomForestClassifier.predict does
+        prediction_probas = forest.predict_proba(features)
+        predictions = forest.classes_[prediction_probas.argmax(axis=1)]
+        
+        # Score columns for the whole batch in one pass each
+        rounded_probas = np.round(prediction_probas, 3)
+        confidences = rounded_probas.max(axis=1).tolist()
+        risk_scores = rounded_probas[:, 1].tolist()
+        safe_scores = rounded_probas[:, 0].tolist()
+        safety_statuses = np.where(predictions == 0, 'safe', 'risky').tolist()
+        
+        def result(i, location):
+            return {
+                'location_index': i,
+                'prediction': safety_statuses[i],
+                'confidence': confidences[i],
+                'risk_score': risk_scores[i],
+                'safe_score': safe_scores[i],
+                'input_data': location
+            }
+        
+        # NDJSON on request: one prediction per line, serialized as it is sent
+        if request.args.get('stream') == '1' or \
+                request.accept_mimetypes.best == 'application/x-ndjson':
+            def generate():
+                for i, location in enumerate(locations):
+                    yield app.json.dumps(result(i, location)) + '\n'
             
-            try:
-                batch_data.append({
-                    'Crime_ID': f'batch_prediction_{i}',
-                    'Crime_Type': str(location['crime_type']),
-                    'Location': 'Batch Prediction Location',
-                    'Latitude': float(location['latitude']),
-                    'Longitude': float(location['longitude']),
-                    'Date': datetime.now().strftime('%Y-%m-%d'),
-                    'Time': str(location['time']),
-                    'Severity': int(location['severity']),
-                    'Police_Station': 'Unknown PS'
-                })
-            except (ValueError, TypeError) as e:
-                return jsonify({
-                    'error': f'Location {i}: Invalid data types: {str(e)}'
-                }), 400
-        
-        # Create DataFrame
-        input_df = pd.DataFrame(batch_data)
-        
-        # Preprocess input data
-        features = preprocessor.transform(input_df)
-        
-        # Make predictions
-        predictions = model.predict(features)
-        prediction_probas = model.predict_proba(features)
+            return Response(generate(), mimetype='application/x-ndjson')
         
         # Create response
-        results = []
-        for i, (pred, proba) in enumerate(zip(predictions, prediction_probas)):
-            safety_status = 'safe' if pred == 0 else 'risky'
-            confidence = max(proba)
-            
-            results.append({
-                'location_index': i,
-                'prediction': safety_status,
-                'confidence': round(confidence, 3),
-                'risk_score': round(proba[1], 3),
-                'safe_score': round(proba[0], 3),
-                'input_data': locations[i]
-            })
+        results = [result(i, location) for i, location in enumerate(locations)]
         
         response = {
             'predictions': results,
             'total_locations': len(results),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': _request_time()[1]
         }
         
         return jsonify(response)
@@ -324,7 +445,7 @@ def model_info():
             'model_loaded': True,
             'preprocessor_loaded': preprocessor is not None and preprocessor.is_fitted,
             'feature_names': preprocessor.get_feature_names() if preprocessor else [],
-            'timestamp': datetime.now().isoformat()
+            'timestamp': _request_time()[1]
         }
         
         # Add model-specific information
@@ -377,7 +498,7 @@ def check_grid_zone():
         
         return jsonify({
             'grid_analysis': result,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': _request_time()[1]
         })
         
     except Exception as e:
@@ -407,7 +528,7 @@ def nearby_risk_zones():
         
         return jsonify({
             'nearby_analysis': result,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': _request_time()[1]
         })
         
     except Exception as e:
@@ -425,7 +546,7 @@ def grid_summary():
         
         return jsonify({
             'grid_summary': summary,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': _request_time()[1]
         })
         
     except Exception as e:
@@ -451,59 +572,69 @@ def live_safety_check():
         lat = float(data['latitude'])
         lon = float(data['longitude'])
         
+        now, now_iso, today_str = _request_time()
+        
         # Optional parameters with defaults
-        current_time = data.get('time', datetime.now().strftime('%H:%M'))
+        current_time = data['time'] if 'time' in data else now.strftime('%H:%M')
         severity = int(data.get('severity', 3))  # Default medium severity
         crime_type = data.get('crime_type', 'General Safety')  # Default type
         user_id = data.get('user_id', 'anonymous')  # For tracking multiple users
         
         # Check if models are loaded
-        if model is None or preprocessor is None:
+        if not READY:
             return jsonify({'error': 'ML model not loaded'}), 500
         
         # 1. GRID-BASED RISK ASSESSMENT
+        grid_zone = RiskZone.UNKNOWN
         grid_risk = None
         if grid_classifier is not None:
-            grid_result = grid_classifier.check_location_in_grid(lat, lon)
-            grid_risk = grid_result.get('risk_zone', 'unknown')
+            grid_zone = grid_classifier.get_zone_code(lat, lon)
+            grid_risk = zone_to_string(grid_zone)
         
         # 2. ML MODEL PREDICTION
-        input_data = pd.DataFrame([{
-            'Crime_ID': f'live_check_{user_id}',
-            'Crime_Type': crime_type,
-            'Location': 'Live Location',
-            'Latitude': lat,
-            'Longitude': lon,
-            'Date': datetime.now().strftime('%Y-%m-%d'),
-            'Time': current_time,
-            'Severity': severity,
-            'Police_Station': 'Unknown PS'
-        }])
-        
-        features = preprocessor.transform(input_data)
-        ml_prediction = model.predict(features)[0]
-        ml_proba = model.predict_proba(features)[0]
-        ml_safety = 'safe' if ml_prediction == 0 else 'risky'
-        
-        # 3. COMBINED RISK ASSESSMENT
-        final_risk_level, notification_text, alert_color = _generate_live_notification(
-            grid_risk, ml_safety, ml_proba, current_time, lat, lon
+        # Safe and low-risk grid cells skip the model unless the caller sends its own
+        # crime details or asks for it with ?force_ml=1
+        skip_ml = (
+            grid_zone in ML_OPTIONAL_ZONES
+            and 'crime_type' not in data and 'severity' not in data
+            and request.args.get('force_ml') != '1'
         )
         
-        # 4. SAFETY RECOMMENDATIONS
-        recommendations = _get_safety_recommendations(final_risk_level, current_time)
+        if skip_ml:
+            ml_risky = False
+            ml_safety = 'not_evaluated'
+            ml_confidence = 0.0
+            detailed_scores = None
+        else:
+            features = preprocessor.transform_one(
+                lat, lon, current_time, severity, crime_type, today_str
+            )
+            ml_prediction, ml_proba = _predict_one(features)
+            ml_risky = ml_prediction != 0
+            ml_safety = 'risky' if ml_risky else 'safe'
+            rounded_proba = np.round(ml_proba, 3).tolist()
+            ml_confidence = max(rounded_proba)
+            detailed_scores = {
+                'risk_score': rounded_proba[1],
+                'safe_score': rounded_proba[0]
+            }
+        
+        # 3. COMBINED RISK ASSESSMENT AND 4. SAFETY RECOMMENDATIONS
+        final_risk_level, notification_text, alert_color, recommendations = _live_assessment(
+            grid_zone, ml_risky, _hour_of(current_time)
+        )
         
         response = {
             'user_id': user_id,
             'location': {
                 'latitude': lat,
                 'longitude': lon,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now_iso
             },
             'risk_assessment': {
                 'grid_risk': grid_risk,
                 'ml_prediction': ml_safety,
-                'ml_confidence': round(max(ml_proba), 3),
+                'ml_confidence': ml_confidence,
                 'final_risk_level': final_risk_level
             },
             'notification': {
@@ -512,10 +643,7 @@ def live_safety_check():
                 'should_notify': final_risk_level in ['high', 'critical']
             },
             'safety_recommendations': recommendations,
-            'detailed_scores': {
-                'risk_score': round(ml_proba[1], 3),
-                'safe_score': round(ml_proba[0], 3)
-            }
+            'detailed_scores': detailed_scores
         }
         
         return jsonify(response)
@@ -524,16 +652,31 @@ def live_safety_check():
         print(f"Error in live safety check: {e}")
         return jsonify({'error': f'Live safety check failed: {str(e)}'}), 500
 
-def _generate_live_notification(grid_risk, ml_safety, ml_proba, current_time, lat, lon):
+# Live notifications depend only on the grid zone class, the ML verdict and the
+# time of day, so every combination is evaluated once at import
+NOTIFICATION_GRID_CLASSES = {RiskZone.MEDIUM_RISK: 1, RiskZone.HIGH_RISK: 2}  # any other zone counts as 0
+DAY, LATE_EVENING, NIGHT = 0, 1, 2
+
+# Time bucket of each hour of the day, indexed by hour
+HOUR_TIME_BUCKETS = tuple(
+    DAY if 7 <= hour <= 17 else LATE_EVENING if 18 <= hour <= 21 else NIGHT
+    for hour in range(24)
+)
+
+def _time_bucket(hour):
+    """Map an hour to DAY (7-17), LATE_EVENING (18-21) or NIGHT (22-6)"""
+    # Out-of-range hours from free-form times count as night, as they always have
+    return HOUR_TIME_BUCKETS[hour] if 0 <= hour < 24 else NIGHT
+
+def _build_live_notification(grid_class, ml_risky, time_bucket):
     """Generate notification text based on combined risk assessment"""
     
     # Time-based risk factor
-    hour = int(current_time.split(':')[0])
-    is_night = hour >= 22 or hour <= 6
-    is_late_evening = 18 <= hour <= 21
+    is_night = time_bucket == NIGHT
+    is_late_evening = time_bucket == LATE_EVENING
     
     # Combined risk assessment
-    if grid_risk == 'high_risk' and ml_safety == 'risky':
+    if grid_class == 2 and ml_risky:
         risk_level = 'critical'
         if is_night:
             notification = "🚨 CRITICAL ALERT: You're in a high-risk area during night hours. Consider leaving immediately or finding a safe location."
@@ -541,7 +684,7 @@ def _generate_live_notification(grid_risk, ml_safety, ml_proba, current_time, la
             notification = "⚠️ HIGH RISK ZONE: You're currently in a dangerous area. Stay alert and consider moving to a safer location."
         color = 'red'
         
-    elif grid_risk == 'high_risk' or ml_safety == 'risky':
+    elif grid_class == 2 or ml_risky:
         risk_level = 'high'
         if is_night:
             notification = "⚠️ CAUTION: Elevated risk detected during night hours. Stay vigilant and avoid isolated areas."
@@ -549,12 +692,12 @@ def _generate_live_notification(grid_risk, ml_safety, ml_proba, current_time, la
             notification = "⚠️ CAUTION: You're in an area with elevated safety concerns. Stay alert."
         color = 'orange'
         
-    elif grid_risk == 'medium_risk' and (is_night or is_late_evening):
+    elif grid_class == 1 and (is_night or is_late_evening):
         risk_level = 'medium'
         notification = "📍 ADVISORY: Medium risk area during evening/night. Stay with groups if possible."
         color = 'yellow'
         
-    elif grid_risk == 'medium_risk':
+    elif grid_class == 1:
         risk_level = 'low'
         notification = "📍 Safe area, but stay aware of your surroundings."
         color = 'green'
@@ -569,47 +712,66 @@ def _generate_live_notification(grid_risk, ml_safety, ml_proba, current_time, la
     
     return risk_level, notification, color
 
-def _get_safety_recommendations(risk_level, current_time):
+def _build_safety_recommendations(risk_level, is_night):
     """Get contextual safety recommendations"""
     
-    hour = int(current_time.split(':')[0])
-    is_night = hour >= 22 or hour <= 6
-    
-    base_recommendations = [
+    base_recommendations = (
         "Keep your phone charged and accessible",
         "Share your location with trusted contacts",
         "Stay in well-lit, populated areas"
-    ]
+    )
     
     if risk_level == 'critical':
-        return base_recommendations + [
+        return base_recommendations + (
             "Leave the area immediately if possible",
             "Call emergency services if you feel threatened",
             "Find the nearest police station or safe building",
             "Avoid walking alone"
-        ]
+        )
     elif risk_level == 'high':
-        return base_recommendations + [
+        return base_recommendations + (
             "Consider changing your route",
             "Stay with groups if possible",
             "Avoid displaying valuables",
             "Trust your instincts"
-        ]
+        )
     elif risk_level == 'medium':
-        return base_recommendations + [
+        return base_recommendations + (
             "Be extra vigilant",
             "Avoid shortcuts through isolated areas"
-        ]
+        )
     else:
         if is_night:
-            return base_recommendations + [
-                "Take standard night-time precautions"
-            ]
+            return base_recommendations + (
+                "Take standard night-time precautions",
+            )
         else:
-            return [
+            return (
                 "Enjoy your time while staying aware",
                 "Standard safety practices apply"
-            ]
+            )
+
+# (grid_class, ml_risky, time_bucket) -> (risk_level, notification, alert_color, recommendations)
+NOTIFICATION_TABLE = {}
+for _grid_class in (0, 1, 2):
+    for _ml_risky in (False, True):
+        for _bucket in (DAY, LATE_EVENING, NIGHT):
+            _risk_level, _notification, _color = _build_live_notification(_grid_class, _ml_risky, _bucket)
+            NOTIFICATION_TABLE[(_grid_class, _ml_risky, _bucket)] = (
+                _risk_level, _notification, _color,
+                _build_safety_recommendations(_risk_level, _bucket == NIGHT)
+            )
+
+@lru_cache(maxsize=2048)
+def _hour_of(current_time):
+    """Return the hour of an 'HH:MM' time; there are only 1440 distinct times to parse"""
+    return int(current_time.split(':')[0])
+
+def _live_assessment(grid_zone, ml_risky, hour):
+    """Return (risk_level, notification, alert_color, recommendations) for a live check"""
+    return NOTIFICATION_TABLE[(
+        NOTIFICATION_GRID_CLASSES.get(grid_zone, 0), ml_risky, _time_bucket(hour)
+    )]
 
 @app.route('/track_user_journey', methods=['POST'])
 def track_user_journey():
@@ -625,49 +787,63 @@ def track_user_journey():
         
         locations = data['locations']
         user_id = data.get('user_id', 'anonymous')
+        now_iso = _request_time()[1]
         
         journey_analysis = []
         alerts = []
+        high_risk_points = medium_risk_points = safe_points = 0
         
-        for i, location in enumerate(locations):
-            lat = float(location['latitude'])
-            lon = float(location['longitude'])
-            timestamp = location.get('timestamp', datetime.now().isoformat())
+        # Parse all points up front so the grid lookup is a single vectorized call
+        lats = np.fromiter((float(location['latitude']) for location in locations),
+                           dtype=np.float64, count=len(locations))
+        lons = np.fromiter((float(location['longitude']) for location in locations),
+                           dtype=np.float64, count=len(locations))
+        
+        if grid_classifier is not None:
+            zones = grid_classifier.check_locations_in_grid(lats, lons)
             
-            # Quick safety check for each location
-            if grid_classifier is not None:
-                grid_result = grid_classifier.check_location_in_grid(lat, lon)
-                risk_zone = grid_result.get('risk_zone', 'unknown')
-                
-                location_analysis = {
+            # One counting pass over all zones; shift by one so RiskZone.UNKNOWN (-1) lands in bin 0
+            zone_counts = np.bincount(zones + 1, minlength=len(ZONE_LABELS)).tolist()
+            high_risk_points = zone_counts[RiskZone.HIGH_RISK + 1]
+            medium_risk_points = zone_counts[RiskZone.MEDIUM_RISK + 1]
+            safe_points = zone_counts[RiskZone.LOW_RISK + 1]
+            
+            # RiskZone.UNKNOWN (-1) indexes the trailing 'unknown' label
+            zone_labels = ZONE_LABELS[zones]
+            journey_analysis = [
+                {
                     'point_index': i,
                     'location': {'latitude': lat, 'longitude': lon},
-                    'timestamp': timestamp,
-                    'risk_zone': risk_zone
+                    'timestamp': location.get('timestamp', now_iso),
+                    'risk_zone': zone_label
+                }
+                for i, (location, lat, lon, zone_label) in enumerate(
+                    zip(locations, lats.tolist(), lons.tolist(), zone_labels)
+                )
+            ]
+            
+            # Generate alerts for high-risk areas
+            alerts = [
+                {
+                    'point_index': i,
+                    'alert_type': 'high_risk_area',
+                    'message': f"High risk area detected at point {i+1}",
+                    'location': {'latitude': float(lats[i]), 'longitude': float(lons[i])}
                 }
-                
-                journey_analysis.append(location_analysis)
-                
-                # Generate alerts for high-risk areas
-                if risk_zone == 'high_risk':
-                    alerts.append({
-                        'point_index': i,
-                        'alert_type': 'high_risk_area',
-                        'message': f"High risk area detected at point {i+1}",
-                        'location': {'latitude': lat, 'longitude': lon}
-                    })
+                for i in np.flatnonzero(zones == RiskZone.HIGH_RISK).tolist()
+            ]
         
         return jsonify({
             'user_id': user_id,
             'journey_summary': {
                 'total_points': len(locations),
-                'high_risk_points': len([p for p in journey_analysis if p['risk_zone'] == 'high_risk']),
-                'medium_risk_points': len([p for p in journey_analysis if p['risk_zone'] == 'medium_risk']),
-                'safe_points': len([p for p in journey_analysis if p['risk_zone'] == 'low_risk'])
+                'high_risk_points': high_risk_points,
+                'medium_risk_points': medium_risk_points,
+                'safe_points': safe_points
             },
             'alerts': alerts,
             'journey_analysis': journey_analysis,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso
         })
         
     except Exception as e:
@@ -729,11 +905,15 @@ def debug_files():
     except Exception as e:
         return jsonify({'error': f'Debug failed: {str(e)}'}), 500
 
+# Load at import so WSGI servers (gunicorn api.app:app) serve a loaded app too,
+# and refuse to start rather than answer every prediction with an error
+print("Loading model and preprocessor...")
+if not load_model_and_preprocessor():
+    print("❌ Model or preprocessor could not be loaded, exiting")
+    sys.exit(1)
+
 if __name__ == '__main__':
-    # Load model and preprocessor on startup
-    print("Loading model and preprocessor...")
-    load_model_and_preprocessor()
-    
+    # Development server; deployments run gunicorn with gunicorn.conf.py
     # Use PORT from environment for Render, default to 5001
     port = int(os.environ.get('PORT', 5001))
     print("Starting Women EmpowerHer API server...")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Convert the crime CSV into the pre-parsed arrays the Firebase grid classifier loads at cold start
+
+Run once per deploy, whenever the crime data changes:
+    python build_crime_npz.py [csv_path] [npz_path]
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from utils.file_utils import atomic_write
+
+def build_crime_npz(csv_path, npz_path):
+    """Write the Latitude, Longitude, Severity and Crime_Type columns of csv_path to npz_path"""
+    start = time.perf_counter()
+    try:
+        crime_data = pd.read_csv(
+            csv_path,
+            usecols=['Crime_Type', 'Latitude', 'Longitude', 'Severity'],
+            dtype={'Crime_Type': str, 'Latitude': 'float64', 'Longitude': 'float64', 'Severity': 'int64'}
+        )
+    except FileNotFoundError:
+        print(f"❌ Crime data not found: {csv_path}")
+        return False
+    csv_seconds = time.perf_counter() - start
+
+    if crime_data.isna().any().any():
+        print(f"❌ {csv_path} has missing values; fix the CSV first")
+        return False
+
+    # Crime types as codes into a small table of names, so no pickled objects are needed
+    crime_type_codes, crime_type_names = pd.factorize(crime_data['Crime_Type'])
+
+    with atomic_write(npz_path, suffix='.tmp.npz') as tmp_path:
+        np.savez(
+            tmp_path,
+            latitude=crime_data['Latitude'].to_numpy(),
+            longitude=crime_data['Longitude'].to_numpy(),
+            severity=crime_data['Severity'].to_numpy().astype(np.int8),
+            crime_type_codes=crime_type_codes.astype(np.int16),
+            crime_type_names=np.asarray(crime_type_names, dtype=str)
+        )
+
+    start = time.perf_counter()
+    with np.load(npz_path) as arrays:
+        for name in arrays.files:
+            arrays[name]
+    npz_seconds = time.perf_counter() - start
+
+    print(f"✅ Wrote {npz_path} ({len(crime_data)} crimes, {os.path.getsize(npz_path)} bytes)")
+    print(f"   Load time: {csv_seconds:.3f}s from CSV, {npz_seconds:.3f}s from npz")
+    return True
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join('data', 'crime_data.csv')
+    npz_path = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(csv_path)[0] + '.npz'
+    sys.exit(0 if build_crime_npz(csv_path, npz_path) else 1)
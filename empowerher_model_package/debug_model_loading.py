@@ -4,13 +4,9 @@ Debug script to test model loading locally
 """
 
 import os
-import sys
 import joblib
 import pandas as pd
 
-# Add utils to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
-
 def test_model_loading():
     """Test if models can be loaded locally"""
     
@@ -64,7 +60,15 @@ def test_model_loading():
         from utils.grid_classifier import GridClassifier
         data_path = "data/crime_data.csv"
         if os.path.exists(data_path):
-            crime_data = pd.read_csv(data_path)
+            # The grid only needs these columns; coordinates stay float64 so
+            # cell boundaries match the API's grid
+            crime_data = pd.read_csv(
+                data_path,
+                usecols=['Crime_Type', 'Latitude', 'Longitude', 'Severity'],
+                dtype={'Latitude': 'float64', 'Longitude': 'float64', 'Severity': 'int8',
+                       'Crime_Type': 'category'},
+                engine='c'
+            )
             print(f"   ✅ Crime data loaded: {len(crime_data)} records")
             
             grid_classifier = GridClassifier(grid_size=0.01)
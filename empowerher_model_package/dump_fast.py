@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Re-save the trained model uncompressed with pickle protocol 5 for faster loading
+
+Run once per deploy, with the same scikit-learn version the API runs:
+    python dump_fast.py [model_path]
+"""
+
+import os
+import sys
+import time
+import joblib
+
+from utils.file_utils import atomic_write
+
+def dump_fast(model_path):
+    """Re-save model_path in place without compression, using pickle protocol 5"""
+    if not os.path.exists(model_path):
+        print(f"❌ Model file not found: {model_path}")
+        return False
+
+    start = time.perf_counter()
+    model = joblib.load(model_path)
+    load_seconds = time.perf_counter() - start
+
+    with atomic_write(model_path) as tmp_path:
+        joblib.dump(model, tmp_path, compress=0, protocol=5)
+
+    start = time.perf_counter()
+    joblib.load(model_path, mmap_mode='r')
+    fast_load_seconds = time.perf_counter() - start
+
+    print(f"✅ Re-saved {model_path} ({os.path.getsize(model_path)} bytes)")
+    print(f"   Load time: {load_seconds:.3f}s before, {fast_load_seconds:.3f}s after")
+    return True
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join('model', 'crime_predictor.pkl')
+    sys.exit(0 if dump_fast(path) else 1)
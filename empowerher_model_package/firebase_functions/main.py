@@ -1,55 +1,98 @@
 import functions_framework
-from flask import Flask, request, jsonify
+from flask import request, jsonify
 import joblib
-import pandas as pd
 import numpy as np
 import os
 import sys
+import threading
+import warnings
 from datetime import datetime
-import tempfile
-import zipfile
+from functools import lru_cache
 
-# Add parent directory to path to import utils
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    import orjson
+except ImportError:  # Fall back to Flask's jsonify
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Fall back to field-by-field validation
+    msgspec = None
+
+# Deployments bundle utils/, model/ and data/ next to this file (see
+# firebase_deployment_guide.md); a repository checkout keeps them one level up
+FUNCTION_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(FUNCTION_DIR)
+if not os.path.isdir(os.path.join(FUNCTION_DIR, 'utils')):
+    sys.path.append(REPO_DIR)
+ASSET_DIR = FUNCTION_DIR if os.path.isdir(os.path.join(FUNCTION_DIR, 'model')) else REPO_DIR
 
 from utils.preprocess import CrimeDataPreprocessor
-from utils.grid_classifier import GridClassifier
+from utils.grid_classifier import GridClassifier, RISK_ZONE_LABELS, HIGH_RISK
+from utils.forest_predictor import ForestPredictor
+
+# Single-row features are passed to the model as plain arrays rather than DataFrames
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+# orjson also serializes the numpy floats the model returns
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC if orjson is not None else 0
+
+if msgspec is not None:
+    class PredictRequest(msgspec.Struct):
+        """A well-typed predict_safety body, decoded and type-checked in one pass"""
+        latitude: float
+        longitude: float
+        time: str
+        severity: int
+        crime_type: str
+    
+    _predict_request_decoder = msgspec.json.Decoder(PredictRequest)
 
 # Global variables for model and preprocessor
 model = None
 preprocessor = None
 grid_classifier = None
+forest = None
+
+# functions-framework serves requests on a gthread worker (THREADS env var), so
+# loading is serialized in case it is ever triggered from a request thread
+_load_lock = threading.Lock()
 
 def load_model_and_preprocessor():
-    """Load the trained model and preprocessor"""
-    global model, preprocessor, grid_classifier
+    """Load the trained model and preprocessor, returning whether predictions can be served"""
+    with _load_lock:
+        return _load_model_and_preprocessor()
+
+def _load_model_and_preprocessor():
+    """Body of load_model_and_preprocessor, run under _load_lock"""
+    global model, preprocessor, grid_classifier, forest
     
     try:
-        # Load model from Firebase Storage or bundled with function
-        model_path = os.path.join(os.path.dirname(__file__), '..', 'model', 'crime_predictor.pkl')
-        if os.path.exists(model_path):
-            model = joblib.load(model_path)
+        # Load model bundled with the function
+        model_path = os.path.join(ASSET_DIR, 'model', 'crime_predictor.pkl')
+        # No exists() check first: joblib opens the file anyway and raises if it's missing
+        try:
+            # Memory-map the arrays pickled outside the trees instead of copying them
+            model = joblib.load(model_path, mmap_mode='r')
+            forest = ForestPredictor(model)
             print(f"Model loaded from {model_path}")
-        else:
+        except FileNotFoundError:
             print(f"Model file not found at {model_path}")
             model = None
         
         # Load preprocessor
-        preprocessor_path = os.path.join(os.path.dirname(__file__), '..', 'model', 'preprocessor.pkl')
+        preprocessor_path = os.path.join(ASSET_DIR, 'model', 'preprocessor.pkl')
         preprocessor = CrimeDataPreprocessor()
-        if os.path.exists(preprocessor_path):
-            preprocessor.load_preprocessor(preprocessor_path)
-            print(f"Preprocessor loaded from {preprocessor_path}")
-        else:
-            print(f"Preprocessor file not found at {preprocessor_path}")
+        preprocessor.load_preprocessor(preprocessor_path)
+        if not preprocessor.is_fitted:
             preprocessor = None
         
         # Initialize grid classifier
         try:
             # Load crime data for grid classification
-            data_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'crime_data.csv')
-            if os.path.exists(data_path):
-                crime_data = pd.read_csv(data_path)
+            crime_data = _load_crime_data(os.path.join(ASSET_DIR, 'data'))
+            
+            if crime_data is not None:
                 grid_classifier = GridClassifier(grid_size=0.01)  # 1.1 km grids
                 grid_summary = grid_classifier.create_grid(crime_data)
                 print(f"Grid classifier initialized with {grid_summary['total_grids']} grids")
@@ -57,7 +100,6 @@ def load_model_and_preprocessor():
                 print(f"Medium risk zones: {grid_summary['medium_risk_grids']}")
                 print(f"Low risk zones: {grid_summary['low_risk_grids']}")
             else:
-                print(f"Crime data not found at {data_path}")
                 grid_classifier = None
         except Exception as e:
             print(f"Error initializing grid classifier: {e}")
@@ -68,6 +110,108 @@ def load_model_and_preprocessor():
         model = None
         preprocessor = None
         grid_classifier = None
+    
+    return model is not None and preprocessor is not None and preprocessor.is_fitted
+
+def _load_crime_data(data_dir):
+    """
+    Load the crime columns the grid reads, preferring the pre-parsed crime_data.npz
+    
+    build_crime_npz.py writes the npz at deploy time; it is skipped when missing
+    or older than crime_data.csv, which is then parsed instead. Returns None
+    when there is no crime data at all.
+    """
+    csv_path = os.path.join(data_dir, 'crime_data.csv')
+    npz_path = os.path.join(data_dir, 'crime_data.npz')
+    
+    try:
+        if not os.path.exists(csv_path) or os.path.getmtime(npz_path) >= os.path.getmtime(csv_path):
+            with np.load(npz_path) as arrays:
+                crime_data = {
+                    'Latitude': arrays['latitude'],
+                    'Longitude': arrays['longitude'],
+                    'Severity': arrays['severity'],
+                    'Crime_Type': arrays['crime_type_names'][arrays['crime_type_codes']]
+                }
+            print(f"Crime data loaded from {npz_path}")
+            return crime_data
+    except FileNotFoundError:
+        pass
+    
+    # pandas is only needed when the npz is unavailable
+    import pandas as pd
+    
+    try:
+        # Only the columns the grid reads, with dtypes given up front
+        crime_data = pd.read_csv(
+            csv_path,
+            usecols=['Crime_Type', 'Latitude', 'Longitude', 'Severity'],
+            dtype={'Crime_Type': str, 'Latitude': 'float64', 'Longitude': 'float64', 'Severity': 'int64'},
+            engine='c'
+        )
+    except FileNotFoundError:
+        print(f"Crime data not found at {csv_path}")
+        return None
+    print(f"Crime data loaded from {csv_path}")
+    return crime_data
+
+# Load once per container at import; warm invocations reuse the globals. Failing
+# here makes the platform discard the instance instead of serving errors, so
+# handlers can rely on model and preprocessor (only the grid is optional).
+if not load_model_and_preprocessor():
+    raise RuntimeError("Model or preprocessor could not be loaded")
+
+# (day ordinal, 'YYYY-MM-DD') for the most recent request; the date string
+# only changes once a day, so most requests skip strftime
+_date_cache = (None, None)
+
+def _date_string(now):
+    """Return now formatted as %Y-%m-%d, reusing the string while the day is unchanged"""
+    global _date_cache
+    day, date_str = _date_cache
+    if day != now.toordinal():
+        date_str = now.strftime('%Y-%m-%d')
+        _date_cache = (now.toordinal(), date_str)
+    return date_str
+
+def _json_response(payload, status, headers):
+    """Build a (body, status, headers) JSON response, serialized with orjson when available"""
+    if orjson is None:
+        return (jsonify(payload), status, headers)
+    return (orjson.dumps(payload, option=ORJSON_OPTIONS), status,
+            {**headers, 'Content-Type': 'application/json'})
+
+def _request_json(request):
+    """
+    Parse a JSON request body like request.get_json(silent=True), using orjson when available
+    
+    Bodies orjson rejects (NaN literals, oversized integers, ...) are handed to
+    Flask's parser, so anything get_json accepted before is still accepted.
+    """
+    if orjson is None or not request.is_json:
+        return request.get_json(silent=True)
+    
+    try:
+        return orjson.loads(request.get_data())
+    except orjson.JSONDecodeError:
+        return request.get_json(silent=True)
+
+def _decode_predict_request(request):
+    """
+    Decode a predict_safety body with msgspec when it is already well-typed
+    
+    Returns (lat, lon, severity, time, crime_type), or None when msgspec is
+    unavailable or the body needs the lenient field-by-field path (numeric
+    strings, missing fields, ...), which also produces the error messages.
+    """
+    if msgspec is None or not request.is_json:
+        return None
+    
+    try:
+        body = _predict_request_decoder.decode(request.get_data())
+    except msgspec.DecodeError:
+        return None
+    return body.latitude, body.longitude, body.severity, body.time, body.crime_type
 
 @functions_framework.http
 def predict_safety(request):
@@ -87,73 +231,61 @@ def predict_safety(request):
     }
     
     try:
-        # Load model if not loaded
-        if model is None or preprocessor is None:
-            load_model_and_preprocessor()
-        
-        # Get request data
-        request_json = request.get_json(silent=True)
-        
-        if not request_json:
-            return (jsonify({'error': 'No data provided'}), 400, headers)
+        # Well-typed bodies are parsed and checked in one msgspec pass
+        fields = _decode_predict_request(request)
         
-        # Extract required fields
-        required_fields = ['latitude', 'longitude', 'time', 'severity', 'crime_type']
-        missing_fields = [field for field in required_fields if field not in request_json]
-        
-        if missing_fields:
-            return (jsonify({
-                'error': f'Missing required fields: {missing_fields}'
-            }), 400, headers)
-        
-        # Validate data types
-        try:
-            lat = float(request_json['latitude'])
-            lon = float(request_json['longitude'])
-            severity = int(request_json['severity'])
-            time = str(request_json['time'])
-            crime_type = str(request_json['crime_type'])
-        except (ValueError, TypeError) as e:
-            return (jsonify({'error': f'Invalid data types: {str(e)}'}), 400, headers)
+        if fields is not None:
+            lat, lon, severity, time, crime_type = fields
+        else:
+            # Get request data
+            request_json = _request_json(request)
+            
+            if not request_json:
+                return _json_response({'error': 'No data provided'}, 400, headers)
+            
+            # Extract required fields
+            required_fields = ['latitude', 'longitude', 'time', 'severity', 'crime_type']
+            missing_fields = [field for field in required_fields if field not in request_json]
+            
+            if missing_fields:
+                return _json_response({
+                    'error': f'Missing required fields: {missing_fields}'
+                }, 400, headers)
+            
+            # Validate data types
+            try:
+                lat = float(request_json['latitude'])
+                lon = float(request_json['longitude'])
+                severity = int(request_json['severity'])
+                time = str(request_json['time'])
+                crime_type = str(request_json['crime_type'])
+            except (ValueError, TypeError) as e:
+                return _json_response({'error': f'Invalid data types: {str(e)}'}, 400, headers)
         
         # Validate ranges
         if not (-90 <= lat <= 90):
-            return (jsonify({'error': 'Latitude must be between -90 and 90'}), 400, headers)
+            return _json_response({'error': 'Latitude must be between -90 and 90'}, 400, headers)
         
         if not (-180 <= lon <= 180):
-            return (jsonify({'error': 'Longitude must be between -180 and 180'}), 400, headers)
+            return _json_response({'error': 'Longitude must be between -180 and 180'}, 400, headers)
         
         if not (1 <= severity <= 5):
-            return (jsonify({'error': 'Severity must be between 1 and 5'}), 400, headers)
-        
-        # Check if model and preprocessor are loaded
-        if model is None or preprocessor is None or not preprocessor.is_fitted:
-            return (jsonify({
-                'error': 'Model or preprocessor not loaded. Please ensure the model is trained.'
-            }), 500, headers)
-        
-        # Create input DataFrame
-        input_data = pd.DataFrame([{
-            'Crime_ID': 'prediction_request',
-            'Crime_Type': crime_type,
-            'Location': 'Prediction Location',
-            'Latitude': lat,
-            'Longitude': lon,
-            'Date': datetime.now().strftime('%Y-%m-%d'),
-            'Time': time,
-            'Severity': severity,
-            'Police_Station': 'Unknown PS'
-        }])
-        
-        # Preprocess input data
-        features = preprocessor.transform(input_data)
-        
-        # Make prediction
-        prediction = model.predict(features)[0]
-        prediction_proba = model.predict_proba(features)[0]
-        
-        # Get confidence score
-        confidence = max(prediction_proba)
+            return _json_response({'error': 'Severity must be between 1 and 5'}, 400, headers)
+        
+        # One clock read per request, shared by the features and the response
+        now = datetime.now()
+        
+        # Preprocess input directly into a feature row (no DataFrame on the hot path)
+        features = preprocessor.transform_one(
+            lat, lon, time, severity, crime_type, _date_string(now)
+        )
+        
+        # Make prediction: one probability pass, class derived from it
+        prediction, prediction_proba = forest.predict_one(features)
+        
+        # Round all class probabilities in one numpy call; confidence is the top one
+        rounded_proba = np.round(prediction_proba, 3)
+        confidence = float(rounded_proba.max())
         
         # Determine safety status
         safety_status = 'safe' if prediction == 0 else 'risky'
@@ -161,9 +293,9 @@ def predict_safety(request):
         # Create response
         response = {
             'prediction': safety_status,
-            'confidence': round(confidence, 3),
-            'risk_score': round(prediction_proba[1], 3),  # Probability of being risky
-            'safe_score': round(prediction_proba[0], 3),  # Probability of being safe
+            'confidence': confidence,
+            'risk_score': float(rounded_proba[1]),  # Probability of being risky
+            'safe_score': float(rounded_proba[0]),  # Probability of being safe
             'input_data': {
                 'latitude': lat,
                 'longitude': lon,
@@ -171,14 +303,124 @@ def predict_safety(request):
                 'severity': severity,
                 'crime_type': crime_type
             },
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now.isoformat()
         }
         
-        return (jsonify(response), 200, headers)
+        return _json_response(response, 200, headers)
         
     except Exception as e:
         print(f"Error in prediction: {e}")
-        return (jsonify({'error': f'Prediction failed: {str(e)}'}), 500, headers)
+        return _json_response({'error': f'Prediction failed: {str(e)}'}, 500, headers)
+
+@functions_framework.http
+def predict_safety_batch(request):
+    """
+    Firebase Cloud Function for safety prediction on many inputs at once
+    Accepts a JSON array of predict_safety inputs, or {"locations": [...]}
+    """
+    # Set CORS headers
+    if request.method == 'OPTIONS':
+        headers = {
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Methods': 'POST',
+            'Access-Control-Allow-Headers': 'Content-Type',
+            'Access-Control-Max-Age': '3600'
+        }
+        return ('', 204, headers)
+    
+    headers = {
+        'Access-Control-Allow-Origin': '*'
+    }
+    
+    try:
+        # Get request data
+        request_json = _request_json(request)
+        locations = request_json.get('locations') if isinstance(request_json, dict) else request_json
+        
+        if not locations:
+            return _json_response({'error': 'No data provided'}, 400, headers)
+        
+        if not isinstance(locations, list):
+            return _json_response({'error': 'Locations must be a list'}, 400, headers)
+        
+        if len(locations) > 100:  # Limit batch size
+            return _json_response({'error': 'Batch size too large. Maximum 100 locations.'}, 400, headers)
+        
+        # Validate every input into typed columns
+        required_fields = ['latitude', 'longitude', 'time', 'severity', 'crime_type']
+        n_locations = len(locations)
+        latitudes = np.empty(n_locations, dtype=np.float64)
+        longitudes = np.empty(n_locations, dtype=np.float64)
+        severities = np.empty(n_locations, dtype=np.int64)
+        times = [None] * n_locations
+        crime_types = [None] * n_locations
+        
+        for i, location in enumerate(locations):
+            if not isinstance(location, dict):
+                return _json_response({'error': f'Location {i}: must be an object'}, 400, headers)
+            
+            missing_fields = [field for field in required_fields if field not in location]
+            if missing_fields:
+                return _json_response({
+                    'error': f'Location {i}: Missing required fields: {missing_fields}'
+                }, 400, headers)
+            
+            try:
+                latitudes[i] = float(location['latitude'])
+                longitudes[i] = float(location['longitude'])
+                severities[i] = int(location['severity'])
+                times[i] = str(location['time'])
+                crime_types[i] = str(location['crime_type'])
+            except (ValueError, TypeError, OverflowError) as e:
+                return _json_response({'error': f'Location {i}: Invalid data types: {str(e)}'}, 400, headers)
+            
+            # Validate ranges
+            if not (-90 <= latitudes[i] <= 90):
+                return _json_response({'error': f'Location {i}: Latitude must be between -90 and 90'}, 400, headers)
+            
+            if not (-180 <= longitudes[i] <= 180):
+                return _json_response({'error': f'Location {i}: Longitude must be between -180 and 180'}, 400, headers)
+            
+            if not (1 <= severities[i] <= 5):
+                return _json_response({'error': f'Location {i}: Severity must be between 1 and 5'}, 400, headers)
+        
+        now = datetime.now()
+        
+        # One feature matrix and one model pass for the whole batch
+        features = preprocessor.transform_many(
+            latitudes, longitudes, times, severities, crime_types, _date_string(now)
+        )
+        prediction_probas = forest.predict_proba(features)
+        predictions = forest.classes_[prediction_probas.argmax(axis=1)]
+        
+        rounded_probas = np.round(prediction_probas, 3)
+        confidences = rounded_probas.max(axis=1).tolist()
+        risk_scores = rounded_probas[:, 1].tolist()
+        safe_scores = rounded_probas[:, 0].tolist()
+        
+        results = [{
+            'prediction': 'safe' if predictions[i] == 0 else 'risky',
+            'confidence': confidences[i],
+            'risk_score': risk_scores[i],  # Probability of being risky
+            'safe_score': safe_scores[i],  # Probability of being safe
+            'input_data': {
+                'latitude': float(latitudes[i]),
+                'longitude': float(longitudes[i]),
+                'time': times[i],
+                'severity': int(severities[i]),
+                'crime_type': crime_types[i]
+            }
+        } for i in range(n_locations)]
+        
+        return _json_response({
+            'predictions': results,
+            'total_locations': n_locations,
+            'timestamp': now.isoformat()
+        }, 200, headers)
+        
+    except Exception as e:
+        print(f"Error in batch prediction: {e}")
+        return _json_response({'error': f'Batch prediction failed: {str(e)}'}, 500, headers)
 
 @functions_framework.http
 def live_safety_check(request):
@@ -201,76 +443,65 @@ def live_safety_check(request):
     }
     
     try:
-        # Load model if not loaded
-        if model is None or preprocessor is None:
-            load_model_and_preprocessor()
-        
         # Get request data
-        data = request.get_json(silent=True)
+        data = _request_json(request)
         
         if not data:
-            return (jsonify({'error': 'No data provided'}), 400, headers)
+            return _json_response({'error': 'No data provided'}, 400, headers)
         
         # Required fields
         if 'latitude' not in data or 'longitude' not in data:
-            return (jsonify({'error': 'latitude and longitude are required'}), 400, headers)
+            return _json_response({'error': 'latitude and longitude are required'}, 400, headers)
         
         lat = float(data['latitude'])
         lon = float(data['longitude'])
+        now = datetime.now()
         
         # Optional parameters with defaults
-        current_time = data.get('time', datetime.now().strftime('%H:%M'))
+        current_time = data.get('time', now.strftime('%H:%M'))
         severity = int(data.get('severity', 3))  # Default medium severity
         crime_type = data.get('crime_type', 'General Safety')  # Default type
         user_id = data.get('user_id', 'anonymous')  # For tracking multiple users
         
-        # Check if models are loaded
-        if model is None or preprocessor is None:
-            return (jsonify({'error': 'ML model not loaded'}), 500, headers)
-        
         # 1. GRID-BASED RISK ASSESSMENT
+        # Only the zone is needed here, so skip building the full cell report
         grid_risk = None
         if grid_classifier is not None:
-            grid_result = grid_classifier.check_location_in_grid(lat, lon)
-            grid_risk = grid_result.get('risk_zone', 'unknown')
+            grid_risk = RISK_ZONE_LABELS[grid_classifier.get_zone_code(lat, lon)]
         
         # 2. ML MODEL PREDICTION
-        input_data = pd.DataFrame([{
-            'Crime_ID': f'live_check_{user_id}',
-            'Crime_Type': crime_type,
-            'Location': 'Live Location',
-            'Latitude': lat,
-            'Longitude': lon,
-            'Date': datetime.now().strftime('%Y-%m-%d'),
-            'Time': current_time,
-            'Severity': severity,
-            'Police_Station': 'Unknown PS'
-        }])
-        
-        features = preprocessor.transform(input_data)
-        ml_prediction = model.predict(features)[0]
-        ml_proba = model.predict_proba(features)[0]
+        # Straight into a float32 feature row, no single-row DataFrame
+        features = preprocessor.transform_one(
+            lat, lon, current_time, severity, crime_type, _date_string(now)
+        )
+        # One pass over the forest; the class is the argmax, as model.predict derives it
+        ml_prediction, ml_proba = forest.predict_one(features)
         ml_safety = 'safe' if ml_prediction == 0 else 'risky'
         
         # 3. COMBINED RISK ASSESSMENT
+        # The time of day is parsed once and shared by both lookups
+        time_bucket = _time_bucket(current_time)
         final_risk_level, notification_text, alert_color = _generate_live_notification(
-            grid_risk, ml_safety, ml_proba, current_time, lat, lon
+            grid_risk, ml_safety, time_bucket
         )
         
         # 4. SAFETY RECOMMENDATIONS
-        recommendations = _get_safety_recommendations(final_risk_level, current_time)
+        recommendations = _get_safety_recommendations(final_risk_level, time_bucket)
+        
+        # Round both class probabilities in one numpy call; confidence is the top one
+        rounded_proba = np.round(ml_proba, 3)
         
         response = {
             'user_id': user_id,
             'location': {
                 'latitude': lat,
                 'longitude': lon,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now.isoformat()
             },
             'risk_assessment': {
                 'grid_risk': grid_risk,
                 'ml_prediction': ml_safety,
-                'ml_confidence': round(max(ml_proba), 3),
+                'ml_confidence': float(rounded_proba.max()),
                 'final_risk_level': final_risk_level
             },
             'notification': {
@@ -280,16 +511,16 @@ def live_safety_check(request):
             },
             'safety_recommendations': recommendations,
             'detailed_scores': {
-                'risk_score': round(ml_proba[1], 3),
-                'safe_score': round(ml_proba[0], 3)
+                'risk_score': float(rounded_proba[1]),
+                'safe_score': float(rounded_proba[0])
             }
         }
         
-        return (jsonify(response), 200, headers)
+        return _json_response(response, 200, headers)
         
     except Exception as e:
         print(f"Error in live safety check: {e}")
-        return (jsonify({'error': f'Live safety check failed: {str(e)}'}), 500, headers)
+        return _json_response({'error': f'Live safety check failed: {str(e)}'}, 500, headers)
 
 @functions_framework.http
 def track_user_journey(request):
@@ -312,66 +543,74 @@ def track_user_journey(request):
     }
     
     try:
-        # Load model if not loaded
-        if grid_classifier is None:
-            load_model_and_preprocessor()
-        
         # Get request data
-        data = request.get_json(silent=True)
+        data = _request_json(request)
         
         if not data or 'locations' not in data:
-            return (jsonify({'error': 'locations array is required'}), 400, headers)
+            return _json_response({'error': 'locations array is required'}, 400, headers)
         
         locations = data['locations']
         user_id = data.get('user_id', 'anonymous')
+        request_timestamp = datetime.now().isoformat()
+        
+        # Gather every point's coordinates first, then look all of them up at once
+        latitudes = []
+        longitudes = []
+        for location in locations:
+            latitudes.append(float(location['latitude']))
+            longitudes.append(float(location['longitude']))
+        latitudes = np.array(latitudes, dtype=np.float64)
+        longitudes = np.array(longitudes, dtype=np.float64)
         
         journey_analysis = []
         alerts = []
+        safe_points = medium_risk_points = high_risk_points = 0
         
-        for i, location in enumerate(locations):
-            lat = float(location['latitude'])
-            lon = float(location['longitude'])
-            timestamp = location.get('timestamp', datetime.now().isoformat())
+        if grid_classifier is not None:
+            zones = grid_classifier.check_locations_in_grid(latitudes, longitudes)
             
-            # Quick safety check for each location
-            if grid_classifier is not None:
-                grid_result = grid_classifier.check_location_in_grid(lat, lon)
-                risk_zone = grid_result.get('risk_zone', 'unknown')
-                
-                location_analysis = {
-                    'point_index': i,
-                    'location': {'latitude': lat, 'longitude': lon},
-                    'timestamp': timestamp,
-                    'risk_zone': risk_zone
-                }
-                
-                journey_analysis.append(location_analysis)
-                
-                # Generate alerts for high-risk areas
-                if risk_zone == 'high_risk':
-                    alerts.append({
-                        'point_index': i,
-                        'alert_type': 'high_risk_area',
-                        'message': f"High risk area detected at point {i+1}",
-                        'location': {'latitude': lat, 'longitude': lon}
-                    })
-        
-        return (jsonify({
+            # One counting pass over the int8 zone codes; shift by one so
+            # UNKNOWN_ZONE (-1) lands in bin 0, ahead of low/medium/high
+            _, safe_points, medium_risk_points, high_risk_points = np.bincount(
+                zones + 1, minlength=len(RISK_ZONE_LABELS)
+            ).tolist()
+            risk_zones = [RISK_ZONE_LABELS[zone] for zone in zones.tolist()]
+            points = [
+                {'latitude': lat, 'longitude': lon}
+                for lat, lon in zip(latitudes.tolist(), longitudes.tolist())
+            ]
+            
+            journey_analysis = [{
+                'point_index': i,
+                'location': points[i],
+                'timestamp': location.get('timestamp', request_timestamp),
+                'risk_zone': risk_zones[i]
+            } for i, location in enumerate(locations)]
+            
+            # Generate alerts for high-risk areas
+            alerts = [{
+                'point_index': i,
+                'alert_type': 'high_risk_area',
+                'message': f"High risk area detected at point {i+1}",
+                'location': dict(points[i])
+            } for i in np.flatnonzero(zones == HIGH_RISK).tolist()]
+        
+        return _json_response({
             'user_id': user_id,
             'journey_summary': {
                 'total_points': len(locations),
-                'high_risk_points': len([p for p in journey_analysis if p['risk_zone'] == 'high_risk']),
-                'medium_risk_points': len([p for p in journey_analysis if p['risk_zone'] == 'medium_risk']),
-                'safe_points': len([p for p in journey_analysis if p['risk_zone'] == 'low_risk'])
+                'high_risk_points': high_risk_points,
+                'medium_risk_points': medium_risk_points,
+                'safe_points': safe_points
             },
             'alerts': alerts,
             'journey_analysis': journey_analysis,
-            'timestamp': datetime.now().isoformat()
-        }), 200, headers)
+            'timestamp': request_timestamp
+        }, 200, headers)
         
     except Exception as e:
         print(f"Error in user journey tracking: {e}")
-        return (jsonify({'error': f'Journey tracking failed: {str(e)}'}), 500, headers)
+        return _json_response({'error': f'Journey tracking failed: {str(e)}'}, 500, headers)
 
 @functions_framework.http
 def check_grid_zone(request):
@@ -391,34 +630,30 @@ def check_grid_zone(request):
     }
     
     try:
-        # Load model if not loaded
-        if grid_classifier is None:
-            load_model_and_preprocessor()
-        
-        data = request.get_json(silent=True)
+        data = _request_json(request)
         
         if not data:
-            return (jsonify({'error': 'No data provided'}), 400, headers)
+            return _json_response({'error': 'No data provided'}, 400, headers)
         
         if 'latitude' not in data or 'longitude' not in data:
-            return (jsonify({'error': 'latitude and longitude are required'}), 400, headers)
+            return _json_response({'error': 'latitude and longitude are required'}, 400, headers)
         
         lat = float(data['latitude'])
         lon = float(data['longitude'])
         
         if grid_classifier is None:
-            return (jsonify({'error': 'Grid classifier not loaded'}), 500, headers)
+            return _json_response({'error': 'Grid classifier not loaded'}, 500, headers)
         
         result = grid_classifier.check_location_in_grid(lat, lon)
         
-        return (jsonify({
+        return _json_response({
             'grid_analysis': result,
             'timestamp': datetime.now().isoformat()
-        }), 200, headers)
+        }, 200, headers)
         
     except Exception as e:
         print(f"Error in grid zone check: {e}")
-        return (jsonify({'error': f'Grid zone check failed: {str(e)}'}), 500, headers)
+        return _json_response({'error': f'Grid zone check failed: {str(e)}'}, 500, headers)
 
 @functions_framework.http
 def nearby_risk_zones(request):
@@ -438,35 +673,31 @@ def nearby_risk_zones(request):
     }
     
     try:
-        # Load model if not loaded
-        if grid_classifier is None:
-            load_model_and_preprocessor()
-        
-        data = request.get_json(silent=True)
+        data = _request_json(request)
         
         if not data:
-            return (jsonify({'error': 'No data provided'}), 400, headers)
+            return _json_response({'error': 'No data provided'}, 400, headers)
         
         if 'latitude' not in data or 'longitude' not in data:
-            return (jsonify({'error': 'latitude and longitude are required'}), 400, headers)
+            return _json_response({'error': 'latitude and longitude are required'}, 400, headers)
         
         lat = float(data['latitude'])
         lon = float(data['longitude'])
         radius = float(data.get('radius_km', 2))  # Default 2km radius
         
         if grid_classifier is None:
-            return (jsonify({'error': 'Grid classifier not loaded'}), 500, headers)
+            return _json_response({'error': 'Grid classifier not loaded'}, 500, headers)
         
         result = grid_classifier.get_nearby_risk_zones(lat, lon, radius)
         
-        return (jsonify({
+        return _json_response({
             'nearby_analysis': result,
             'timestamp': datetime.now().isoformat()
-        }), 200, headers)
+        }, 200, headers)
         
     except Exception as e:
         print(f"Error in nearby risk zones: {e}")
-        return (jsonify({'error': f'Nearby risk zones failed: {str(e)}'}), 500, headers)
+        return _json_response({'error': f'Nearby risk zones failed: {str(e)}'}, 500, headers)
 
 @functions_framework.http
 def grid_summary(request):
@@ -476,23 +707,19 @@ def grid_summary(request):
     }
     
     try:
-        # Load model if not loaded
-        if grid_classifier is None:
-            load_model_and_preprocessor()
-        
         if grid_classifier is None:
-            return (jsonify({'error': 'Grid classifier not loaded'}), 500, headers)
+            return _json_response({'error': 'Grid classifier not loaded'}, 500, headers)
         
         summary = grid_classifier._get_grid_summary()
         
-        return (jsonify({
+        return _json_response({
             'grid_summary': summary,
             'timestamp': datetime.now().isoformat()
-        }), 200, headers)
+        }, 200, headers)
         
     except Exception as e:
         print(f"Error getting grid summary: {e}")
-        return (jsonify({'error': f'Grid summary failed: {str(e)}'}), 500, headers)
+        return _json_response({'error': f'Grid summary failed: {str(e)}'}, 500, headers)
 
 @functions_framework.http
 def health_check(request):
@@ -501,27 +728,44 @@ def health_check(request):
         'Access-Control-Allow-Origin': '*'
     }
     
-    if model is None or preprocessor is None or grid_classifier is None:
-        load_model_and_preprocessor()
-    
-    return (jsonify({
+    # Reports what was loaded at import and never retries loading, so probes
+    # stay fast even when a model file is missing or broken
+    return _json_response({
         'status': 'healthy',
         'model_loaded': model is not None,
         'preprocessor_loaded': preprocessor is not None and preprocessor.is_fitted,
         'grid_classifier_loaded': grid_classifier is not None,
         'timestamp': datetime.now().isoformat()
-    }), 200, headers) 
+    }, 200, headers) 
 
-def _generate_live_notification(grid_risk, ml_safety, ml_proba, current_time, lat, lon):
+# Live notifications depend only on the grid zone, the ML verdict and the time
+# of day, so every combination is evaluated once at import
+NOTIFICATION_GRID_CLASSES = {'medium_risk': 1, 'high_risk': 2}  # any other zone counts as 0
+DAY, LATE_EVENING, NIGHT = 0, 1, 2
+
+# Time bucket of each hour of the day, indexed by hour
+HOUR_TIME_BUCKETS = tuple(
+    DAY if 7 <= hour <= 17 else LATE_EVENING if 18 <= hour <= 21 else NIGHT
+    for hour in range(24)
+)
+
+# There are only 1440 distinct 'HH:MM' times, so each is parsed once
+@lru_cache(maxsize=2048)
+def _time_bucket(current_time):
+    """Map an 'HH:MM' time to DAY (7-17), LATE_EVENING (18-21) or NIGHT (22-6)"""
+    hour = int(current_time.split(':')[0])
+    # Out-of-range hours from free-form times count as night, as they always have
+    return HOUR_TIME_BUCKETS[hour] if 0 <= hour < 24 else NIGHT
+
+def _build_live_notification(grid_class, ml_risky, time_bucket):
     """Generate notification text based on combined risk assessment"""
     
     # Time-based risk factor
-    hour = int(current_time.split(':')[0])
-    is_night = hour >= 22 or hour <= 6
-    is_late_evening = 18 <= hour <= 21
+    is_night = time_bucket == NIGHT
+    is_late_evening = time_bucket == LATE_EVENING
     
     # Combined risk assessment
-    if grid_risk == 'high_risk' and ml_safety == 'risky':
+    if grid_class == 2 and ml_risky:
         risk_level = 'critical'
         if is_night:
             notification = "🚨 CRITICAL ALERT: You're in a high-risk area during night hours. Consider leaving immediately or finding a safe location."
@@ -529,7 +773,7 @@ def _generate_live_notification(grid_risk, ml_safety, ml_proba, current_time, la
             notification = "⚠️ HIGH RISK ZONE: You're currently in a dangerous area. Stay alert and consider moving to a safer location."
         color = 'red'
         
-    elif grid_risk == 'high_risk' or ml_safety == 'risky':
+    elif grid_class == 2 or ml_risky:
         risk_level = 'high'
         if is_night:
             notification = "⚠️ CAUTION: Elevated risk detected during night hours. Stay vigilant and avoid isolated areas."
@@ -537,12 +781,12 @@ def _generate_live_notification(grid_risk, ml_safety, ml_proba, current_time, la
             notification = "⚠️ CAUTION: You're in an area with elevated safety concerns. Stay alert."
         color = 'orange'
         
-    elif grid_risk == 'medium_risk' and (is_night or is_late_evening):
+    elif grid_class == 1 and (is_night or is_late_evening):
         risk_level = 'medium'
         notification = "📍 ADVISORY: Medium risk area during evening/night. Stay with groups if possible."
         color = 'yellow'
         
-    elif grid_risk == 'medium_risk':
+    elif grid_class == 1:
         risk_level = 'low'
         notification = "📍 Safe area, but stay aware of your surroundings."
         color = 'green'
@@ -557,44 +801,66 @@ def _generate_live_notification(grid_risk, ml_safety, ml_proba, current_time, la
     
     return risk_level, notification, color
 
-def _get_safety_recommendations(risk_level, current_time):
+def _build_safety_recommendations(risk_level, is_night):
     """Get contextual safety recommendations"""
     
-    hour = int(current_time.split(':')[0])
-    is_night = hour >= 22 or hour <= 6
-    
-    base_recommendations = [
+    base_recommendations = (
         "Keep your phone charged and accessible",
         "Share your location with trusted contacts",
         "Stay in well-lit, populated areas"
-    ]
+    )
     
     if risk_level == 'critical':
-        return base_recommendations + [
+        return base_recommendations + (
             "Leave the area immediately if possible",
             "Call emergency services if you feel threatened",
             "Find the nearest police station or safe building",
             "Avoid walking alone"
-        ]
+        )
     elif risk_level == 'high':
-        return base_recommendations + [
+        return base_recommendations + (
             "Consider changing your route",
             "Stay with groups if possible",
             "Avoid displaying valuables",
             "Trust your instincts"
-        ]
+        )
     elif risk_level == 'medium':
-        return base_recommendations + [
+        return base_recommendations + (
             "Be extra vigilant",
             "Avoid shortcuts through isolated areas"
-        ]
+        )
     else:
         if is_night:
-            return base_recommendations + [
-                "Take standard night-time precautions"
-            ]
+            return base_recommendations + (
+                "Take standard night-time precautions",
+            )
         else:
-            return [
+            return (
                 "Enjoy your time while staying aware",
                 "Standard safety practices apply"
-            ] 
\ No newline at end of file
+            )
+
+# (grid_class, ml_risky, time_bucket) -> (risk_level, notification, alert_color)
+NOTIFICATION_TABLE = {
+    (_grid_class, _ml_risky, _bucket): _build_live_notification(_grid_class, _ml_risky, _bucket)
+    for _grid_class in (0, 1, 2)
+    for _ml_risky in (False, True)
+    for _bucket in (DAY, LATE_EVENING, NIGHT)
+}
+
+# (risk_level, is_night) -> recommendations
+RECOMMENDATION_TABLE = {
+    (_risk_level, _is_night): _build_safety_recommendations(_risk_level, _is_night)
+    for _risk_level in ('critical', 'high', 'medium', 'low', 'safe')
+    for _is_night in (False, True)
+}
+
+def _generate_live_notification(grid_risk, ml_safety, time_bucket):
+    """Generate notification text based on combined risk assessment"""
+    return NOTIFICATION_TABLE[(
+        NOTIFICATION_GRID_CLASSES.get(grid_risk, 0), ml_safety == 'risky', time_bucket
+    )]
+
+def _get_safety_recommendations(risk_level, time_bucket):
+    """Get contextual safety recommendations"""
+    return RECOMMENDATION_TABLE[(risk_level, time_bucket == NIGHT)]
@@ -0,0 +1,24 @@
+# Gunicorn configuration for the EmpowerHer API
+# Usage: gunicorn -c gunicorn.conf.py api.app:app
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+
+# Threaded workers: predict_proba and the numpy code release the GIL, so a few
+# threads per worker overlap requests. Set GUNICORN_WORKER_CLASS=sync to fall
+# back to one request per worker if threads cause trouble on a platform.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# One worker per core, capped so small instances don't run out of memory
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count(), 4)))
+
+# Load the model, preprocessor and grid once in the master; forked workers
+# share those pages instead of each loading their own copy
+preload_app = True
+
+# Model loading can be slow on cold starts
+timeout = 300
+
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
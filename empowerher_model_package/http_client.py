@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for the API test scripts
+"""
+
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # Fall back to requests' own JSON decoding
+    orjson = None
+
+# One pooled keep-alive session for every request a script makes, so
+# connections (and TLS) are reused instead of set up per call. Connection
+# failures are retried, but a read timeout is not: retrying it would multiply
+# every health probe's timeout and hide the Timeout from the caller
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=2, read=False, backoff_factor=0.3))
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
+SESSION.headers.update({"Connection": "keep-alive", "Accept-Encoding": "gzip"})
+
+def response_json(response):
+    """Decode a JSON response body, with orjson when it's installed"""
+    if orjson is not None:
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            pass  # Let requests raise its usual error
+    return response.json()
+
+def send_all(probes):
+    """
+    Send every probe at once over SESSION
+
+    probes maps a name to (method, url, request kwargs); the result for each
+    name is its response, or the RequestException the call raised.
+    """
+    def send(probe):
+        method, url, kwargs = probe
+        try:
+            return SESSION.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return dict(zip(probes, executor.map(send, probes.values())))
+
+def response_or_raise(result):
+    """Get the response from a send_all result, raising the call's exception if it failed"""
+    if isinstance(result, Exception):
+        raise result
+    return result
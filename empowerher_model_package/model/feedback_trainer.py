@@ -1,16 +1,95 @@
 import os
 import sys
+import sqlite3
+import threading
 import joblib
 import pandas as pd
+from pandas.api.types import is_numeric_dtype
 import numpy as np
 from datetime import datetime
+from functools import lru_cache
 import json
+import logging
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.firebase_utils import FirebaseManager
-from utils.preprocess import CrimeDataPreprocessor
+from utils.preprocess import CrimeDataPreprocessor, UNKNOWN_POLICE_STATION
+from utils.file_utils import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Trees added per feedback retrain, and how much more each feedback row weighs than an original one
+FEEDBACK_TREES = 10
+FEEDBACK_SAMPLE_WEIGHT = 5.0
+
+# Classes passed to partial_fit: 0 is safe, 1 is risky
+RISK_CLASSES = np.array([0, 1], dtype=np.int8)
+
+# Spare rows kept after the original training data for feedback rows
+TRAINING_SLACK_ROWS = 1000
+
+# Feedback rows collected before a partial_fit update, and shuffled passes over them
+PARTIAL_FIT_BATCH_ROWS = 32
+PARTIAL_FIT_EPOCHS = 5
+
+@lru_cache(maxsize=1)
+def _get_firebase_manager(service_account_path=None):
+    """
+    Get the FirebaseManager shared by every trainer
+    
+    firebase_admin's default app can only be initialized once per process, so
+    a second manager could not connect; sharing one also reuses its channel.
+    """
+    firebase_manager = FirebaseManager(service_account_path)
+    if firebase_manager.test_connection():
+        logger.info("Firebase connection established successfully")
+    else:
+        logger.warning("Firebase connection test failed")
+    return firebase_manager
+
+class ProcessedFeedbackIds:
+    def __init__(self, db_path):
+        """
+        Set of processed feedback IDs kept in a SQLite table instead of memory
+
+        Lookups go to the table's primary-key index, so memory stays flat however
+        many feedbacks the loop has handled, and the IDs survive a restart.
+
+        Args:
+            db_path (str): Path of the SQLite database file
+        """
+        self.db_path = db_path
+        # The snapshot listener checks membership from its own thread
+        try:
+            self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        except sqlite3.Error as e:
+            logger.warning("Cannot open %s (%s); processed feedback IDs won't survive a restart", db_path, e)
+            self._connection = sqlite3.connect(':memory:', check_same_thread=False)
+        self._connection.execute('CREATE TABLE IF NOT EXISTS processed_ids (id TEXT PRIMARY KEY)')
+        self._connection.commit()
+    
+    def __contains__(self, feedback_id):
+        row = self._connection.execute(
+            'SELECT 1 FROM processed_ids WHERE id = ?', (feedback_id,)
+        ).fetchone()
+        return row is not None
+    
+    def __len__(self):
+        return self._connection.execute('SELECT COUNT(*) FROM processed_ids').fetchone()[0]
+    
+    def update(self, feedback_ids):
+        """Add feedback_ids, committing them in one transaction"""
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO processed_ids (id) VALUES (?)',
+                ((feedback_id,) for feedback_id in feedback_ids)
+            )
+    
+    def add(self, feedback_id):
+        """Add a single feedback_id"""
+        self.update([feedback_id])
 
 class FeedbackTrainer:
     def __init__(self, model_path='crime_predictor.pkl', preprocessor_path='preprocessor.pkl'):
@@ -19,8 +98,27 @@ class FeedbackTrainer:
         self.preprocessor_path = preprocessor_path
         self.model = None
         self.preprocessor = None
+        self._supports_partial_fit = False  # Checked once per model rather than per feedback
         self.firebase_manager = None
-        self.processed_feedback_ids = set()
+        
+        # Persisted next to the model so a restart doesn't forget what was processed
+        self.processed_feedback_ids = ProcessedFeedbackIds(
+            os.path.join(os.path.dirname(os.path.abspath(model_path)), 'processed_feedback_ids.db')
+        )
+        
+        # (CSV mtime, original rows plus spare rows, original row count), built on first retrain
+        self._training_buffer = None
+        
+        # (training buffer, preprocessor, features, labels) of the original rows, reused while both are unchanged
+        self._original_arrays = None
+        
+        # partial_fit models: (features, labels) waiting for a full batch, and their feedback IDs
+        self._partial_fit_batches = []
+        self._pending_feedback_ids = []
+        
+        # Set by stop(); the queue is the running loop's, so stop() can wake it
+        self._stop_event = threading.Event()
+        self._feedback_queue = None
         
         # Load existing model and preprocessor
         self.load_model()
@@ -32,26 +130,30 @@ class FeedbackTrainer:
     def initialize_firebase(self, service_account_path=None):
         """Initialize Firebase connection"""
         try:
-            self.firebase_manager = FirebaseManager(service_account_path)
-            if self.firebase_manager.test_connection():
-                print("Firebase connection established successfully")
-            else:
-                print("Warning: Firebase connection test failed")
+            self.firebase_manager = _get_firebase_manager(service_account_path)
         except Exception as e:
-            print(f"Error initializing Firebase: {e}")
+            logger.error("Error initializing Firebase: %s", e)
     
     def load_model(self):
         """Load the trained model"""
         try:
             if os.path.exists(self.model_path):
-                self.model = joblib.load(self.model_path)
-                print(f"Model loaded from {self.model_path}")
+                # Memory-map the large arrays (forest nodes and leaf values) instead of copying them
+                self.model = joblib.load(self.model_path, mmap_mode='r')
+                
+                # partial_fit updates the weights in place, so those alone must be writable
+                if hasattr(self.model, 'partial_fit'):
+                    for attribute in ('coef_', 'intercept_'):
+                        if hasattr(self.model, attribute):
+                            setattr(self.model, attribute, np.array(getattr(self.model, attribute)))
+                logger.info("Model loaded from %s", self.model_path)
             else:
-                print(f"Model file not found at {self.model_path}")
+                logger.warning("Model file not found at %s", self.model_path)
                 self.model = None
         except Exception as e:
-            print(f"Error loading model: {e}")
+            logger.error("Error loading model: %s", e)
             self.model = None
+        self._supports_partial_fit = callable(getattr(self.model, 'partial_fit', None))
     
     def load_preprocessor(self):
         """Load the fitted preprocessor"""
@@ -59,24 +161,25 @@ class FeedbackTrainer:
             self.preprocessor = CrimeDataPreprocessor()
             if os.path.exists(self.preprocessor_path):
                 self.preprocessor.load_preprocessor(self.preprocessor_path)
-                print(f"Preprocessor loaded from {self.preprocessor_path}")
+                logger.info("Preprocessor loaded from %s", self.preprocessor_path)
             else:
-                print(f"Preprocessor file not found at {self.preprocessor_path}")
+                logger.warning("Preprocessor file not found at %s", self.preprocessor_path)
         except Exception as e:
-            print(f"Error loading preprocessor: {e}")
+            logger.error("Error loading preprocessor: %s", e)
     
     def save_model(self):
         """Save the updated model"""
         try:
             if self.model is not None:
-                joblib.dump(self.model, self.model_path)
-                print(f"Model saved to {self.model_path}")
+                with atomic_write(self.model_path) as tmp_path:
+                    joblib.dump(self.model, tmp_path, compress=0, protocol=5)
+                logger.info("Model saved to %s", self.model_path)
                 return True
             else:
-                print("No model to save")
+                logger.warning("No model to save")
                 return False
         except Exception as e:
-            print(f"Error saving model: {e}")
+            logger.error("Error saving model: %s", e)
             return False
     
     def save_preprocessor(self):
@@ -86,86 +189,108 @@ class FeedbackTrainer:
                 self.preprocessor.save_preprocessor(self.preprocessor_path)
                 return True
             else:
-                print("No preprocessor to save")
+                logger.warning("No preprocessor to save")
                 return False
         except Exception as e:
-            print(f"Error saving preprocessor: {e}")
+            logger.error("Error saving preprocessor: %s", e)
             return False
     
     def get_new_feedbacks(self):
         """Get new 'Bad' feedbacks from Firebase"""
         if not self.firebase_manager or not self.firebase_manager.is_initialized:
-            print("Firebase not initialized")
+            logger.warning("Firebase not initialized")
             return []
         
         try:
             new_feedbacks = self.firebase_manager.get_new_bad_feedbacks(
                 processed_ids=self.processed_feedback_ids
             )
-            print(f"Found {len(new_feedbacks)} new bad feedbacks")
+            logger.info("Found %d new bad feedbacks", len(new_feedbacks))
             return new_feedbacks
         except Exception as e:
-            print(f"Error getting new feedbacks: {e}")
+            logger.error("Error getting new feedbacks: %s", e)
             return []
     
     def process_feedback(self, feedback):
         """Process a single feedback and update model if needed"""
-        feedback_id = feedback.get('id')
+        return self.process_feedbacks([feedback])
+    
+    def process_feedbacks(self, feedbacks):
+        """Process a batch of feedbacks with one model update and one batched write"""
+        # Only 'Bad' feedbacks with a location become training rows
+        usable = [
+            feedback for feedback in feedbacks
+            if feedback.get('feedback') == 'Bad' and feedback.get('lat') and feedback.get('lon')
+        ]
+        feedback_ids = [feedback.get('id') for feedback in usable]
         
-        if feedback.get('feedback') != 'Bad':
+        if not usable:
+            logger.warning("No valid training data created from feedback")
             return False
         
-        print(f"Processing feedback ID: {feedback_id}")
+        logger.info("Processing %d feedbacks with location data", len(feedback_ids))
         
-        # Parse feedback suggestion
-        parsed_data = self.firebase_manager.parse_feedback_suggestion(feedback)
-        
-        # Create training data from feedback
-        feedback_df = self.firebase_manager.create_training_data_from_feedback([feedback])
-        
-        if feedback_df.empty:
-            print("No valid training data created from feedback")
-            return False
+        # Create training data from all feedbacks at once
+        feedback_df = self.firebase_manager.create_training_data_from_feedback(usable)
         
         # Update model with new data
         success = self.update_model_with_feedback(feedback_df)
         
         if success:
-            # Mark feedback as processed
-            self.firebase_manager.mark_feedback_processed(feedback_id)
-            self.processed_feedback_ids.add(feedback_id)
-            print(f"Feedback {feedback_id} processed successfully")
+            # Feedbacks still waiting in the partial_fit buffer aren't in the saved model yet
+            self._pending_feedback_ids.extend(feedback_ids)
+            if self._partial_fit_batches:
+                logger.info("%d feedbacks buffered until the next model update", len(feedback_ids))
+                return True
+            feedback_ids, self._pending_feedback_ids = self._pending_feedback_ids, []
+            
+            # Mark feedbacks as processed
+            self.firebase_manager.mark_feedbacks_processed(feedback_ids)
+            self.processed_feedback_ids.update(feedback_ids)
+            logger.info("%d feedbacks processed successfully", len(feedback_ids))
             return True
         else:
-            print(f"Failed to process feedback {feedback_id}")
+            logger.error("Failed to process %d feedbacks", len(feedback_ids))
             return False
     
     def update_model_with_feedback(self, new_data_df):
         """Update the model with new feedback data"""
         try:
             if self.model is None or self.preprocessor is None:
-                print("Model or preprocessor not loaded")
+                logger.warning("Model or preprocessor not loaded")
                 return False
             
             # Preprocess new data
             if not self.preprocessor.is_fitted:
-                print("Preprocessor not fitted. Cannot process new data.")
+                logger.warning("Preprocessor not fitted. Cannot process new data.")
                 return False
             
             # Transform new data
             new_features = self.preprocessor.transform(new_data_df)
             
             # Create labels for new data (all risky since they're from 'Bad' feedback)
-            new_labels = np.ones(len(new_features))
+            new_labels = np.ones(new_features.shape[0], dtype=np.int8)
             
             # Perform partial fit for incremental learning
-            if hasattr(self.model, 'partial_fit'):
-                # For models that support partial_fit (like SGDClassifier)
-                self.model.partial_fit(new_features, new_labels, classes=[0, 1])
-                print("Model updated using partial_fit")
+            if self._supports_partial_fit:
+                # For models that support partial_fit (like SGDClassifier); single rows
+                # converge poorly, so feedback is collected into batches first
+                self._partial_fit_batches.append((new_features, new_labels))
+                n_buffered = sum(len(batch_labels) for _, batch_labels in self._partial_fit_batches)
+                if n_buffered < PARTIAL_FIT_BATCH_ROWS:
+                    logger.info("Buffered feedback for partial_fit (%d/%d rows)", n_buffered, PARTIAL_FIT_BATCH_ROWS)
+                    return True
+                
+                features = pd.concat([batch_features for batch_features, _ in self._partial_fit_batches], ignore_index=True)
+                labels = np.concatenate([batch_labels for _, batch_labels in self._partial_fit_batches])
+                for _ in range(PARTIAL_FIT_EPOCHS):
+                    order = np.random.permutation(len(labels))
+                    self.model.partial_fit(features.iloc[order], labels[order], classes=RISK_CLASSES)
+                self._partial_fit_batches = []
+                logger.info("Model updated using partial_fit (%d rows, %d passes)", len(labels), PARTIAL_FIT_EPOCHS)
             else:
                 # For models that don't support partial_fit, we need to retrain
-                print("Model doesn't support partial_fit. Retraining required.")
+                logger.info("Model doesn't support partial_fit. Retraining required.")
                 return self.retrain_model_with_feedback(new_data_df)
             
             # Save updated model
@@ -173,7 +298,7 @@ class FeedbackTrainer:
             return True
             
         except Exception as e:
-            print(f"Error updating model with feedback: {e}")
+            logger.error("Error updating model with feedback: %s", e)
             return False
     
     def retrain_model_with_feedback(self, new_data_df):
@@ -183,14 +308,15 @@ class FeedbackTrainer:
             original_data_path = os.path.join(os.path.dirname(self.model_path), '..', 'data', 'crime_data.csv')
             
             if not os.path.exists(original_data_path):
-                print("Original training data not found")
+                logger.warning("Original training data not found")
                 return False
             
-            # Load original data
-            original_df = pd.read_csv(original_data_path)
-            
             # Combine original data with feedback data
-            combined_df = pd.concat([original_df, new_data_df], ignore_index=True)
+            combined_df = self._training_frame(original_data_path, new_data_df)
+            
+            # Grow the existing forest when the feedback fits its feature encoding
+            if self._can_add_trees():
+                return self._add_trees_with_feedback(combined_df, len(new_data_df))
             
             # Create new preprocessor and fit on combined data
             new_preprocessor = CrimeDataPreprocessor()
@@ -198,58 +324,247 @@ class FeedbackTrainer:
             
             # Retrain model
             from sklearn.ensemble import RandomForestClassifier
-            new_model = RandomForestClassifier(n_estimators=100, random_state=42)
+            new_model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
             new_model.fit(features, labels)
             
             # Update model and preprocessor
             self.model = new_model
             self.preprocessor = new_preprocessor
+            self._supports_partial_fit = callable(getattr(self.model, 'partial_fit', None))
             
             # Save updated model and preprocessor
             self.save_model()
             self.save_preprocessor()
             
-            print("Model retrained successfully with feedback data")
+            logger.info("Model retrained successfully with feedback data")
             return True
             
         except Exception as e:
-            print(f"Error retraining model: {e}")
+            logger.error("Error retraining model: %s", e)
             return False
     
+    def _load_original_data(self, csv_path):
+        """
+        Load the original training data from a pickled DataFrame cached next to the CSV
+        
+        The cache is rewritten whenever the CSV is newer, so the text is only
+        parsed once per change to the data instead of on every retrain.
+        """
+        cache_path = os.path.splitext(csv_path)[0] + '.pkl'
+        
+        try:
+            if os.path.getmtime(cache_path) >= os.path.getmtime(csv_path):
+                return pd.read_pickle(cache_path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("Ignoring unreadable data cache %s: %s", cache_path, e)
+        
+        original_df = pd.read_csv(csv_path)
+        
+        try:
+            with atomic_write(cache_path) as tmp_path:
+                original_df.to_pickle(tmp_path, compression=None, protocol=5)
+        except Exception as e:
+            logger.warning("Could not cache training data at %s: %s", cache_path, e)
+        
+        return original_df
+    
+    def _training_frame(self, csv_path, new_data_df):
+        """
+        Get the original training data followed by new_data_df without copying the original rows
+        
+        The original rows are kept with TRAINING_SLACK_ROWS spare rows after
+        them; each retrain writes its feedback rows into the spare rows and
+        fits on a slice. A batch that doesn't fit is concatenated instead.
+        """
+        csv_mtime = os.path.getmtime(csv_path)
+        if self._training_buffer is None or self._training_buffer[0] != csv_mtime:
+            original_df = self._load_original_data(csv_path)
+            buffer = original_df.reindex(range(len(original_df) + TRAINING_SLACK_ROWS))
+            self._training_buffer = (csv_mtime, buffer, len(original_df))
+        
+        _, buffer, n_original = self._training_buffer
+        n_feedback = len(new_data_df)
+        if n_feedback > TRAINING_SLACK_ROWS or set(new_data_df.columns) != set(buffer.columns):
+            return pd.concat([buffer.iloc[:n_original], new_data_df], ignore_index=True)
+        
+        for column in new_data_df.columns:
+            values = new_data_df[column].to_numpy()
+            column_dtype = buffer[column].dtype
+            if column_dtype != object and is_numeric_dtype(column_dtype) != is_numeric_dtype(values.dtype):
+                # e.g. 'feedback_<id>' strings in the numeric Crime_ID column; widened once
+                buffer[column] = buffer[column].astype(object)
+            buffer.iloc[n_original:n_original + n_feedback, buffer.columns.get_loc(column)] = values
+        
+        return buffer.iloc[:n_original + n_feedback]
+    
+    def _can_add_trees(self):
+        """Whether the current forest and preprocessor can be grown in place instead of rebuilt"""
+        from sklearn.ensemble import RandomForestClassifier
+        
+        if not isinstance(self.model, RandomForestClassifier):
+            return False
+        if self.preprocessor is None or not self.preprocessor.is_fitted:
+            return False
+        if getattr(self.model, 'n_features_in_', None) != len(self.preprocessor.get_feature_names()):
+            return False
+        
+        # Unseen feedback categories are mapped onto known ones by _known_categories
+        return True
+    
+    def _known_categories(self, feedback_df):
+        """
+        Replace categories the fitted encoders have never seen with ones they have
+        
+        Feedback values are matched case-insensitively, and a bare station name
+        like 'Madukkarai' matches 'Madukkarai PS'. Anything else gets the code
+        transform gives unseen values: UNKNOWN_POLICE_STATION's for police
+        stations, 0 otherwise.
+        """
+        feedback_df = feedback_df.copy()
+        for feature, encoder in self.preprocessor.label_encoders.items():
+            if feature not in feedback_df.columns:
+                continue
+            classes = list(encoder.classes_)
+            by_lower = {str(value).lower(): value for value in classes}
+            fallback = classes[0]
+            if feature == 'Police_Station' and UNKNOWN_POLICE_STATION in by_lower.values():
+                fallback = UNKNOWN_POLICE_STATION
+            
+            def known(value):
+                lower = str(value).lower()
+                return by_lower.get(lower) or by_lower.get(lower + ' ps') or fallback
+            
+            unseen = ~feedback_df[feature].isin(classes)
+            feedback_df.loc[unseen, feature] = feedback_df.loc[unseen, feature].map(known)
+        return feedback_df
+    
+    def _original_training_arrays(self, original_df):
+        """
+        Get the transformed features and risk labels of the original training rows
+        
+        They only depend on the training data and the fitted preprocessor, so
+        they are computed once and reused until either is replaced.
+        """
+        cached = self._original_arrays
+        if cached is None or cached[0] is not self._training_buffer or cached[1] is not self.preprocessor:
+            features = self.preprocessor.transform(original_df)
+            labels = self.preprocessor.create_risk_labels(original_df)
+            cached = (self._training_buffer, self.preprocessor, features, labels)
+            self._original_arrays = cached
+        return cached[2], cached[3]
+    
+    def _add_trees_with_feedback(self, combined_df, n_feedback_rows):
+        """Add FEEDBACK_TREES trees to the forest, fitted with the feedback rows weighted up"""
+        # Feedback rows come last in combined_df; only they change between retrains
+        n_original = len(combined_df) - n_feedback_rows
+        original_features, original_labels = self._original_training_arrays(combined_df.iloc[:n_original])
+        feedback_df = combined_df.iloc[n_original:].reset_index(drop=True)
+        # Labels come from the feedback as given; only the encoding needs known categories
+        labels = np.concatenate([original_labels, self.preprocessor.create_risk_labels(feedback_df)])
+        features = pd.concat(
+            [original_features, self.preprocessor.transform(self._known_categories(feedback_df))],
+            ignore_index=True
+        )
+        
+        sample_weight = np.ones(len(features))
+        sample_weight[len(features) - n_feedback_rows:] = FEEDBACK_SAMPLE_WEIGHT
+        
+        # warm_start keeps the fitted trees and only fits the new ones
+        self.model.set_params(warm_start=True, n_estimators=self.model.n_estimators + FEEDBACK_TREES)
+        self.model.fit(features, labels, sample_weight=sample_weight)
+        
+        # The preprocessor is unchanged, so only the model needs saving
+        self.save_model()
+        
+        logger.info("Added %d trees trained with feedback data (%d total)", FEEDBACK_TREES, self.model.n_estimators)
+        return True
+    
     def run_feedback_loop(self, interval_seconds=300):
-        """Run continuous feedback processing loop"""
-        import time
+        """
+        Run continuous feedback processing loop
+        
+        Feedbacks are pushed by a Firestore snapshot listener instead of being
+        polled. The listener sends each feedback only once, so after
+        interval_seconds without one the collection is polled for anything
+        still unprocessed, which retries batches that failed.
+        """
+        import queue
+        
+        if not self.firebase_manager or not self.firebase_manager.is_initialized:
+            logger.warning("Firebase not initialized")
+            return
+        
+        logger.info("Starting feedback processing loop...")
+        logger.info("Listening for new feedbacks (polling every %s seconds when idle)", interval_seconds)
         
-        print("Starting feedback processing loop...")
-        print(f"Checking for new feedbacks every {interval_seconds} seconds")
+        # The listener thread only queues feedbacks; training happens on this thread
+        self._stop_event.clear()
+        feedback_queue = queue.Queue()
+        self._feedback_queue = feedback_queue
+        watch = self.firebase_manager.watch_new_bad_feedbacks(feedback_queue.put)
+        if watch is None:
+            return
         
         try:
-            while True:
-                # Get new feedbacks
-                new_feedbacks = self.get_new_feedbacks()
+            while not self._stop_event.is_set():
+                try:
+                    new_feedbacks = feedback_queue.get(timeout=interval_seconds)
+                except queue.Empty:
+                    # Catches feedbacks whose processing failed, and any the listener missed
+                    new_feedbacks = self.get_new_feedbacks()
+                    if not new_feedbacks:
+                        logger.debug("No new feedbacks found")
+                        continue
                 
-                if new_feedbacks:
-                    print(f"Processing {len(new_feedbacks)} new feedbacks...")
-                    
-                    for feedback in new_feedbacks:
-                        self.process_feedback(feedback)
-                    
-                    print("Feedback processing completed")
-                else:
-                    print("No new feedbacks found")
+                # Take everything that queued up meanwhile as part of the same batch
+                while True:
+                    try:
+                        new_feedbacks.extend(feedback_queue.get_nowait())
+                    except queue.Empty:
+                        break
                 
-                # Wait before next check
-                time.sleep(interval_seconds)
+                # Feedbacks waiting in the partial_fit buffer are already being used
+                new_feedbacks = [
+                    feedback for feedback in new_feedbacks
+                    if feedback.get('id') not in self.processed_feedback_ids
+                    and feedback.get('id') not in self._pending_feedback_ids
+                ]
+                if not new_feedbacks or self._stop_event.is_set():
+                    continue
                 
+                logger.info("Processing %d new feedbacks...", len(new_feedbacks))
+                
+                # One transform and model update for the whole batch
+                if self.process_feedbacks(new_feedbacks):
+                    logger.info("Feedback processing completed")
+                else:
+                    logger.warning("Feedback processing failed; retrying within %s seconds", interval_seconds)
+        
+            logger.info("Feedback processing loop stopped")
+        
         except KeyboardInterrupt:
-            print("Feedback processing loop stopped by user")
+            logger.info("Feedback processing loop stopped by user")
         except Exception as e:
-            print(f"Error in feedback loop: {e}")
+            logger.error("Error in feedback loop: %s", e)
+        finally:
+            self._stop_event.set()
+            self._feedback_queue = None
+            watch.unsubscribe()
+    
+    def stop(self):
+        """Make a running run_feedback_loop return; safe to call from any thread"""
+        self._stop_event.set()
+        feedback_queue = self._feedback_queue
+        if feedback_queue is not None:
+            # An empty batch wakes the loop without waiting out interval_seconds
+            feedback_queue.put([])
     
     def test_feedback_processing(self):
         """Test feedback processing with mock data"""
         if not self.firebase_manager or not self.firebase_manager.is_initialized:
-            print("Firebase not initialized. Cannot test feedback processing.")
+            logger.warning("Firebase not initialized. Cannot test feedback processing.")
             return False
         
         try:
@@ -263,25 +578,27 @@ class FeedbackTrainer:
                 if feedbacks:
                     # Process the mock feedback
                     result = self.process_feedback(feedbacks[0])
-                    print(f"Test feedback processing result: {result}")
+                    logger.info("Test feedback processing result: %s", result)
                     return result
                 else:
-                    print("No mock feedback found")
+                    logger.warning("No mock feedback found")
                     return False
             else:
-                print("Failed to create mock feedback")
+                logger.warning("Failed to create mock feedback")
                 return False
                 
         except Exception as e:
-            print(f"Error in test feedback processing: {e}")
+            logger.error("Error in test feedback processing: %s", e)
             return False
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv('LOGLEVEL', 'INFO'), format='%(message)s')
+    
     # Example usage
     trainer = FeedbackTrainer()
     
     # Test feedback processing
-    print("Testing feedback processing...")
+    logger.info("Testing feedback processing...")
     trainer.test_feedback_processing()
     
     # Run feedback loop (uncomment to run continuously)
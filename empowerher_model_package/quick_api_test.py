@@ -3,8 +3,10 @@
 Quick API test to see which endpoints work
 """
 
-import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+from http_client import SESSION
 
 def test_endpoints():
     """Test all endpoints to see which ones work"""
@@ -24,36 +26,6 @@ def test_endpoints():
         ("GET", "/grid_summary", None)
     ]
     
-    print("1. Testing Simple Endpoints (No Models Required):")
-    print("-" * 50)
-    
-    for method, endpoint, data in simple_endpoints:
-        try:
-            if method == "GET":
-                response = requests.get(f"{base_url}{endpoint}", timeout=15)
-            else:
-                response = requests.post(f"{base_url}{endpoint}", json=data, timeout=15)
-            
-            if response.status_code == 200:
-                print(f"✅ {method} {endpoint} - WORKING")
-                try:
-                    result = response.json()
-                    if "error" in result:
-                        print(f"   ❌ But returns error: {result['error']}")
-                    else:
-                        print(f"   ✅ Returns data successfully")
-                except:
-                    print(f"   ✅ Returns response (not JSON)")
-            else:
-                print(f"❌ {method} {endpoint} - FAILED ({response.status_code})")
-                print(f"   Response: {response.text[:100]}...")
-                
-        except Exception as e:
-            print(f"❌ {method} {endpoint} - ERROR: {e}")
-    
-    print("\n2. Testing Model-Dependent Endpoints:")
-    print("-" * 50)
-    
     # Test endpoints that require models
     model_endpoints = [
         ("POST", "/live_safety_check", {
@@ -75,27 +47,53 @@ def test_endpoints():
         })
     ]
     
-    for method, endpoint, data in model_endpoints:
+    def probe(spec):
+        """Call one endpoint and return the lines describing the result"""
+        method, endpoint, data = spec
         try:
-            headers = {"Content-Type": "application/json"}
-            response = requests.post(f"{base_url}{endpoint}", json=data, headers=headers, timeout=20)
+            if method == "GET":
+                response = SESSION.get(f"{base_url}{endpoint}", timeout=15)
+            else:
+                headers = {"Content-Type": "application/json"}
+                response = SESSION.post(f"{base_url}{endpoint}", json=data, headers=headers, timeout=20)
             
             if response.status_code == 200:
-                print(f"✅ {method} {endpoint} - WORKING")
+                lines = [f"✅ {method} {endpoint} - WORKING"]
                 try:
                     result = response.json()
                     if "error" in result:
-                        print(f"   ❌ But returns error: {result['error']}")
+                        lines.append(f"   ❌ But returns error: {result['error']}")
                     else:
-                        print(f"   ✅ Returns data successfully")
+                        lines.append(f"   ✅ Returns data successfully")
                 except:
-                    print(f"   ✅ Returns response (not JSON)")
+                    lines.append(f"   ✅ Returns response (not JSON)")
+                return lines
             else:
-                print(f"❌ {method} {endpoint} - FAILED ({response.status_code})")
-                print(f"   Response: {response.text[:100]}...")
+                return [
+                    f"❌ {method} {endpoint} - FAILED ({response.status_code})",
+                    f"   Response: {response.text[:100]}..."
+                ]
                 
         except Exception as e:
-            print(f"❌ {method} {endpoint} - ERROR: {e}")
+            return [f"❌ {method} {endpoint} - ERROR: {e}"]
+    
+    # Probe every endpoint at once, so one slow endpoint doesn't hold up the rest
+    specs = simple_endpoints + model_endpoints
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(probe, specs))
+    
+    # Print in the listed order, whatever order the calls finished in
+    print("1. Testing Simple Endpoints (No Models Required):")
+    print("-" * 50)
+    
+    for lines in results[:len(simple_endpoints)]:
+        print("\n".join(lines))
+    
+    print("\n2. Testing Model-Dependent Endpoints:")
+    print("-" * 50)
+    
+    for lines in results[len(simple_endpoints):]:
+        print("\n".join(lines))
     
     print("\n" + "="*60)
     print("ANALYSIS:")
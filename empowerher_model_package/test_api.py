@@ -7,6 +7,8 @@ import requests
 import json
 import time
 
+from http_client import SESSION
+
 def test_api():
     """Test the API endpoints"""
     base_url = "http://localhost:5001"
@@ -17,7 +19,7 @@ def test_api():
     # Test 1: Health endpoint
     print("1. Testing health endpoint...")
     try:
-        response = requests.get(f"{base_url}/health", timeout=5)
+        response = SESSION.get(f"{base_url}/health", timeout=5)
         if response.status_code == 200:
             health_data = response.json()
             print("✅ Health endpoint working!")
@@ -34,7 +36,7 @@ def test_api():
     # Test 2: Example request endpoint
     print("\n2. Testing example request endpoint...")
     try:
-        response = requests.get(f"{base_url}/example_request", timeout=5)
+        response = SESSION.get(f"{base_url}/example_request", timeout=5)
         if response.status_code == 200:
             example_data = response.json()
             print("✅ Example request endpoint working!")
@@ -55,7 +57,7 @@ def test_api():
     }
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{base_url}/predict",
             json=test_data,
             timeout=10
@@ -80,7 +82,7 @@ def test_api():
     # Test 4: Model info endpoint
     print("\n4. Testing model info endpoint...")
     try:
-        response = requests.get(f"{base_url}/model_info", timeout=5)
+        response = SESSION.get(f"{base_url}/model_info", timeout=5)
         if response.status_code == 200:
             model_info = response.json()
             print("✅ Model info endpoint working!")
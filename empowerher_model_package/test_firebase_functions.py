@@ -9,6 +9,8 @@ import json
 import time
 from datetime import datetime
 
+from http_client import SESSION, response_json, send_all, response_or_raise
+
 def test_firebase_functions():
     """Test the Firebase Functions endpoints"""
     
@@ -18,12 +20,50 @@ def test_firebase_functions():
     print("Testing Firebase Functions for Real-time Monitoring...")
     print("="*60)
     
+    test_locations = [
+        {
+            "latitude": 10.9467,
+            "longitude": 76.8653,
+            "time": "04:00",  # Night time
+            "user_id": "test_user_1"
+        },
+        {
+            "latitude": 10.9467,
+            "longitude": 76.8653,
+            "time": "14:00",  # Day time
+            "user_id": "test_user_1"
+        }
+    ]
+    
+    grid_test_data = {
+        "latitude": 10.9467,
+        "longitude": 76.8653
+    }
+    
+    # One reading of the clock for the whole journey
+    timestamp = datetime.now().isoformat()
+    journey_data = {
+        "user_id": "test_user_1",
+        "locations": [
+            {"latitude": 10.9467, "longitude": 76.8653, "timestamp": timestamp},
+            {"latitude": 10.9468, "longitude": 76.8654, "timestamp": timestamp},
+            {"latitude": 10.9469, "longitude": 76.8655, "timestamp": timestamp}
+        ]
+    }
+    
     # Test 1: Health endpoint
     print("1. Testing health endpoint...")
+    # Checked on its own first, so an unreachable or half-loaded service
+    # fails fast instead of waiting out every other endpoint's timeout
     try:
-        response = requests.get(f"{base_url}/health_check", timeout=10)
+        try:
+            response = SESSION.get(f"{base_url}/health_check", timeout=3)
+        except requests.exceptions.Timeout:
+            # A cold start loads the model, preprocessor and grid before answering
+            print("   No answer within 3s; waiting for a possible cold start...")
+            response = SESSION.get(f"{base_url}/health_check", timeout=10)
         if response.status_code == 200:
-            health_data = response.json()
+            health_data = response_json(response)
             print("✅ Health endpoint working!")
             print(f"   Model loaded: {health_data.get('model_loaded', False)}")
             print(f"   Preprocessor loaded: {health_data.get('preprocessor_loaded', False)}")
@@ -41,33 +81,23 @@ def test_firebase_functions():
         print("   Make sure Firebase Functions is deployed and accessible")
         return False
     
+    # Send every probe at once; the results are reported below in order
+    probes = {}
+    for i, location in enumerate(test_locations):
+        probes[f"live_safety_check_{i}"] = ("POST", f"{base_url}/live_safety_check", {"json": location, "timeout": 15})
+    probes["grid_zone"] = ("POST", f"{base_url}/check_grid_zone", {"json": grid_test_data, "timeout": 10})
+    probes["journey"] = ("POST", f"{base_url}/track_user_journey", {"json": journey_data, "timeout": 15})
+    probes["grid_summary"] = ("GET", f"{base_url}/grid_summary", {"timeout": 10})
+    results = send_all(probes)
+    
     # Test 2: Live safety check endpoint
     print("\n2. Testing live safety check endpoint...")
-    test_locations = [
-        {
-            "latitude": 10.9467,
-            "longitude": 76.8653,
-            "time": "04:00",  # Night time
-            "user_id": "test_user_1"
-        },
-        {
-            "latitude": 10.9467,
-            "longitude": 76.8653,
-            "time": "14:00",  # Day time
-            "user_id": "test_user_1"
-        }
-    ]
-    
-    for i, location in enumerate(test_locations):
+    for i in range(len(test_locations)):
         try:
-            response = requests.post(
-                f"{base_url}/live_safety_check",
-                json=location,
-                timeout=15
-            )
+            response = response_or_raise(results[f"live_safety_check_{i}"])
             
             if response.status_code == 200:
-                safety_data = response.json()
+                safety_data = response_json(response)
                 print(f"✅ Live safety check {i+1} working!")
                 print(f"   Risk Level: {safety_data.get('risk_assessment', {}).get('final_risk_level', 'unknown')}")
                 print(f"   Grid Risk: {safety_data.get('risk_assessment', {}).get('grid_risk', 'unknown')}")
@@ -93,19 +123,10 @@ def test_firebase_functions():
     # Test 3: Grid zone check endpoint
     print("\n3. Testing grid zone check endpoint...")
     try:
-        grid_test_data = {
-            "latitude": 10.9467,
-            "longitude": 76.8653
-        }
-        
-        response = requests.post(
-            f"{base_url}/check_grid_zone",
-            json=grid_test_data,
-            timeout=10
-        )
+        response = response_or_raise(results["grid_zone"])
         
         if response.status_code == 200:
-            grid_data = response.json()
+            grid_data = response_json(response)
             grid_analysis = grid_data.get('grid_analysis', {})
             print("✅ Grid zone check working!")
             print(f"   Risk Zone: {grid_analysis.get('risk_zone', 'unknown')}")
@@ -129,23 +150,10 @@ def test_firebase_functions():
     # Test 4: Journey tracking endpoint
     print("\n4. Testing journey tracking endpoint...")
     try:
-        journey_data = {
-            "user_id": "test_user_1",
-            "locations": [
-                {"latitude": 10.9467, "longitude": 76.8653, "timestamp": datetime.now().isoformat()},
-                {"latitude": 10.9468, "longitude": 76.8654, "timestamp": datetime.now().isoformat()},
-                {"latitude": 10.9469, "longitude": 76.8655, "timestamp": datetime.now().isoformat()}
-            ]
-        }
-        
-        response = requests.post(
-            f"{base_url}/track_user_journey",
-            json=journey_data,
-            timeout=15
-        )
+        response = response_or_raise(results["journey"])
         
         if response.status_code == 200:
-            journey_result = response.json()
+            journey_result = response_json(response)
             journey_summary = journey_result.get('journey_summary', {})
             print("✅ Journey tracking working!")
             print(f"   Total Points: {journey_summary.get('total_points', 0)}")
@@ -166,10 +174,10 @@ def test_firebase_functions():
     # Test 5: Grid summary endpoint
     print("\n5. Testing grid summary endpoint...")
     try:
-        response = requests.get(f"{base_url}/grid_summary", timeout=10)
+        response = response_or_raise(results["grid_summary"])
         
         if response.status_code == 200:
-            summary_data = response.json()
+            summary_data = response_json(response)
             grid_summary = summary_data.get('grid_summary', {})
             print("✅ Grid summary working!")
             print(f"   Total Grids: {grid_summary.get('total_grids', 0)}")
@@ -217,14 +225,14 @@ def test_render_api_comparison():
     # Test Firebase Functions
     print("Testing Firebase Functions...")
     try:
-        firebase_response = requests.post(
+        firebase_response = SESSION.post(
             f"{firebase_url}/live_safety_check",
             json=test_data,
             timeout=15
         )
         
         if firebase_response.status_code == 200:
-            firebase_result = firebase_response.json()
+            firebase_result = response_json(firebase_response)
             print("✅ Firebase Functions working")
             print(f"   Risk Level: {firebase_result.get('risk_assessment', {}).get('final_risk_level', 'unknown')}")
         else:
@@ -235,14 +243,14 @@ def test_render_api_comparison():
     # Test Render API
     print("\nTesting Render API...")
     try:
-        render_response = requests.post(
+        render_response = SESSION.post(
             f"{render_url}/live_safety_check",
             json=test_data,
             timeout=15
         )
         
         if render_response.status_code == 200:
-            render_result = render_response.json()
+            render_result = response_json(render_response)
             print("✅ Render API working")
             print(f"   Risk Level: {render_result.get('risk_assessment', {}).get('final_risk_level', 'unknown')}")
         else:
@@ -251,25 +259,26 @@ def test_render_api_comparison():
         print(f"❌ Render API error: {e}")
 
 if __name__ == "__main__":
-    print("FIREBASE FUNCTIONS REAL-TIME MONITORING TEST")
-    print("="*60)
-    print("This test will verify that your Firebase Functions deployment")
-    print("has all the necessary endpoints for real-time monitoring.")
-    print("\nIMPORTANT: Update the base_url variable with your actual Firebase Functions URL")
-    print("="*60)
+    with SESSION:
+        print("FIREBASE FUNCTIONS REAL-TIME MONITORING TEST")
+        print("="*60)
+        print("This test will verify that your Firebase Functions deployment")
+        print("has all the necessary endpoints for real-time monitoring.")
+        print("\nIMPORTANT: Update the base_url variable with your actual Firebase Functions URL")
+        print("="*60)
     
-    success = test_firebase_functions()
+        success = test_firebase_functions()
     
-    if success:
-        # Optionally run comparison test
-        run_comparison = input("\nDo you want to compare with Render API? (y/n): ").lower().strip()
-        if run_comparison == 'y':
-            test_render_api_comparison()
-    else:
-        print("\n❌ Some tests failed. Please check the issues above.")
-        print("\nCommon issues:")
-        print("1. Firebase Functions not deployed")
-        print("2. Model files not accessible")
-        print("3. Crime data CSV not found")
-        print("4. Grid classifier not initialized")
-        exit(1)
+        if success:
+            # Optionally run comparison test
+            run_comparison = input("\nDo you want to compare with Render API? (y/n): ").lower().strip()
+            if run_comparison == 'y':
+                test_render_api_comparison()
+        else:
+            print("\n❌ Some tests failed. Please check the issues above.")
+            print("\nCommon issues:")
+            print("1. Firebase Functions not deployed")
+            print("2. Model files not accessible")
+            print("3. Crime data CSV not found")
+            print("4. Grid classifier not initialized")
+            exit(1)
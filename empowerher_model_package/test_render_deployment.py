@@ -9,6 +9,8 @@ import json
 import time
 from datetime import datetime
 
+from http_client import SESSION, response_json, send_all, response_or_raise
+
 def test_render_deployment():
     """Test the Render deployment"""
     
@@ -20,12 +22,51 @@ def test_render_deployment():
     print(f"URL: {base_url}")
     print("="*60)
     
+    test_locations = [
+        {
+            "latitude": 10.9467,
+            "longitude": 76.8653,
+            "time": "04:00",  # Night time
+            "user_id": "test_user_1"
+        },
+        {
+            "latitude": 10.9467,
+            "longitude": 76.8653,
+            "time": "14:00",  # Day time
+            "user_id": "test_user_1"
+        }
+    ]
+    
+    grid_test_data = {
+        "latitude": 10.9467,
+        "longitude": 76.8653
+    }
+    
+    # One reading of the clock for the whole journey
+    timestamp = datetime.now().isoformat()
+    journey_data = {
+        "user_id": "test_user_1",
+        "locations": [
+            {"latitude": 10.9467, "longitude": 76.8653, "timestamp": timestamp},
+            {"latitude": 10.9468, "longitude": 76.8654, "timestamp": timestamp},
+            {"latitude": 10.9469, "longitude": 76.8655, "timestamp": timestamp}
+        ]
+    }
+    
+    # Send every probe at once; the results are reported below in order
+    probes = {"health": ("GET", f"{base_url}/health", {"timeout": 15})}
+    for i, location in enumerate(test_locations):
+        probes[f"live_safety_check_{i}"] = ("POST", f"{base_url}/live_safety_check", {"json": location, "timeout": 20})
+    probes["grid_zone"] = ("POST", f"{base_url}/check_grid_zone", {"json": grid_test_data, "timeout": 15})
+    probes["journey"] = ("POST", f"{base_url}/track_user_journey", {"json": journey_data, "timeout": 20})
+    results = send_all(probes)
+    
     # Test 1: Health endpoint
     print("1. Testing health endpoint...")
     try:
-        response = requests.get(f"{base_url}/health", timeout=15)
+        response = response_or_raise(results["health"])
         if response.status_code == 200:
-            health_data = response.json()
+            health_data = response_json(response)
             print("✅ Health endpoint working!")
             print(f"   Status: {health_data.get('status', 'unknown')}")
             print(f"   Model loaded: {health_data.get('model_loaded', False)}")
@@ -49,31 +90,12 @@ def test_render_deployment():
     
     # Test 2: Live safety check endpoint
     print("\n2. Testing live safety check endpoint...")
-    test_locations = [
-        {
-            "latitude": 10.9467,
-            "longitude": 76.8653,
-            "time": "04:00",  # Night time
-            "user_id": "test_user_1"
-        },
-        {
-            "latitude": 10.9467,
-            "longitude": 76.8653,
-            "time": "14:00",  # Day time
-            "user_id": "test_user_1"
-        }
-    ]
-    
-    for i, location in enumerate(test_locations):
+    for i in range(len(test_locations)):
         try:
-            response = requests.post(
-                f"{base_url}/live_safety_check",
-                json=location,
-                timeout=20
-            )
+            response = response_or_raise(results[f"live_safety_check_{i}"])
             
             if response.status_code == 200:
-                safety_data = response.json()
+                safety_data = response_json(response)
                 print(f"✅ Live safety check {i+1} working!")
                 print(f"   Risk Level: {safety_data.get('risk_assessment', {}).get('final_risk_level', 'unknown')}")
                 print(f"   Grid Risk: {safety_data.get('risk_assessment', {}).get('grid_risk', 'unknown')}")
@@ -99,19 +121,10 @@ def test_render_deployment():
     # Test 3: Grid zone check endpoint
     print("\n3. Testing grid zone check endpoint...")
     try:
-        grid_test_data = {
-            "latitude": 10.9467,
-            "longitude": 76.8653
-        }
-        
-        response = requests.post(
-            f"{base_url}/check_grid_zone",
-            json=grid_test_data,
-            timeout=15
-        )
+        response = response_or_raise(results["grid_zone"])
         
         if response.status_code == 200:
-            grid_data = response.json()
+            grid_data = response_json(response)
             grid_analysis = grid_data.get('grid_analysis', {})
             print("✅ Grid zone check working!")
             print(f"   Risk Zone: {grid_analysis.get('risk_zone', 'unknown')}")
@@ -135,23 +148,10 @@ def test_render_deployment():
     # Test 4: Journey tracking endpoint
     print("\n4. Testing journey tracking endpoint...")
     try:
-        journey_data = {
-            "user_id": "test_user_1",
-            "locations": [
-                {"latitude": 10.9467, "longitude": 76.8653, "timestamp": datetime.now().isoformat()},
-                {"latitude": 10.9468, "longitude": 76.8654, "timestamp": datetime.now().isoformat()},
-                {"latitude": 10.9469, "longitude": 76.8655, "timestamp": datetime.now().isoformat()}
-            ]
-        }
-        
-        response = requests.post(
-            f"{base_url}/track_user_journey",
-            json=journey_data,
-            timeout=20
-        )
+        response = response_or_raise(results["journey"])
         
         if response.status_code == 200:
-            journey_result = response.json()
+            journey_result = response_json(response)
             journey_summary = journey_result.get('journey_summary', {})
             print("✅ Journey tracking working!")
             print(f"   Total Points: {journey_summary.get('total_points', 0)}")
@@ -187,7 +187,7 @@ def check_service_status():
     
     print("Checking service status...")
     try:
-        response = requests.get(f"{base_url}/health", timeout=10)
+        response = SESSION.get(f"{base_url}/health", timeout=10)
         if response.status_code == 200:
             print("✅ Service is responding")
             return True
@@ -201,21 +201,21 @@ def check_service_status():
         return False
 
 if __name__ == "__main__":
-    print("RENDER DEPLOYMENT TEST")
-    print("="*60)
-    print("Testing your deployed API at: https://empower-her-ml-model.onrender.com")
-    print("="*60)
+    with SESSION:
+        print("RENDER DEPLOYMENT TEST")
+        print("="*60)
+        print("Testing your deployed API at: https://empower-her-ml-model.onrender.com")
+        print("="*60)
     
-    # First check if service is responding
-    if check_service_status():
-        success = test_render_deployment()
-        if success:
-            print("\n🎉 Your Render deployment is working perfectly!")
-            print("You can now use this URL in your Flutter app:")
-            print("https://empower-her-ml-model.onrender.com")
+        # First check if service is responding
+        if check_service_status():
+            success = test_render_deployment()
+            if success:
+                print("\n🎉 Your Render deployment is working perfectly!")
+                print("You can now use this URL in your Flutter app:")
+                print("https://empower-her-ml-model.onrender.com")
+            else:
+                print("\n❌ Some tests failed. Check the issues above.")
         else:
-            print("\n❌ Some tests failed. Check the issues above.")
-    else:
-        print("\n⚠️  Service might be spinning up. Try again in 30-60 seconds.")
-        print("Free Render instances spin down with inactivity.")
-
+            print("\n⚠️  Service might be spinning up. Try again in 30-60 seconds.")
+            print("Free Render instances spin down with inactivity.")
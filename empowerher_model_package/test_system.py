@@ -10,12 +10,34 @@ import requests
 import pandas as pd
 import joblib
 from datetime import datetime
+from functools import lru_cache
+
+from http_client import SESSION, response_json
+
+try:
+    from pyarrow import csv as pa_csv
+except ImportError:  # Fall back to pandas for the row count
+    pa_csv = None
 
 # Add utils to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
 from utils.preprocess import CrimeDataPreprocessor
 
+# Columns the preprocessor reads, and how many crimes the preprocessing/training tests use
+PREPROCESSOR_COLUMNS = ['Crime_Type', 'Latitude', 'Longitude', 'Date', 'Time', 'Severity', 'Police_Station']
+SAMPLE_ROWS = 500
+
+API_BASE_URL = "http://localhost:5000"
+
+@lru_cache(maxsize=1)
+def _load_fitted():
+    """Read the first SAMPLE_ROWS crimes and fit a preprocessor on them, once per run"""
+    df = pd.read_csv(os.path.join('data', 'crime_data.csv'), usecols=PREPROCESSOR_COLUMNS, nrows=SAMPLE_ROWS)
+    preprocessor = CrimeDataPreprocessor()
+    features, labels = preprocessor.fit_transform(df)
+    return features, labels, preprocessor
+
 def test_data_loading():
     """Test if crime data can be loaded"""
     print("Testing data loading...")
@@ -26,9 +48,15 @@ def test_data_loading():
         return False
     
     try:
-        df = pd.read_csv(data_path)
-        print(f"✓ Data loaded successfully: {len(df)} records")
-        print(f"  Columns: {list(df.columns)}")
+        # Only the row count and header are reported, so skip building a full DataFrame
+        if pa_csv is not None:
+            table = pa_csv.read_csv(data_path)
+            n_records, columns = table.num_rows, table.column_names
+        else:
+            columns = list(pd.read_csv(data_path, nrows=0).columns)
+            n_records = len(pd.read_csv(data_path, usecols=[0]))
+        print(f"✓ Data loaded successfully: {n_records} records")
+        print(f"  Columns: {columns}")
         return True
     except Exception as e:
         print(f"✗ Error loading data: {e}")
@@ -44,12 +72,10 @@ def test_preprocessing():
         return False
     
     try:
-        # Load sample data
-        df = pd.read_csv(data_path).head(100)  # Use first 100 records for testing
-        
-        # Test preprocessor
-        preprocessor = CrimeDataPreprocessor()
-        features, labels = preprocessor.fit_transform(df)
+        # Test preprocessor on the first 100 records, sharing the training test's fit
+        features, labels, _ = _load_fitted()
+        features = features.iloc[:100]
+        labels = labels[:100]
         
         print(f"✓ Preprocessing successful")
         print(f"  Features shape: {features.shape}")
@@ -76,10 +102,8 @@ def test_model_training():
         return False
     
     try:
-        # Load and preprocess data
-        df = pd.read_csv(data_path).head(500)  # Use 500 records for testing
-        preprocessor = CrimeDataPreprocessor()
-        features, labels = preprocessor.fit_transform(df)
+        # Load and preprocess data (SAMPLE_ROWS records)
+        features, labels, _ = _load_fitted()
         
         # Train a simple model
         from sklearn.ensemble import RandomForestClassifier
@@ -89,7 +113,8 @@ def test_model_training():
             features, labels, test_size=0.2, random_state=42
         )
         
-        model = RandomForestClassifier(n_estimators=50, random_state=42)
+        # Same model family and depth as train_model.py, with just enough trees to check the pipeline
+        model = RandomForestClassifier(n_estimators=20, max_depth=10, random_state=42, n_jobs=-1)
         model.fit(X_train, y_train)
         
         # Evaluate
@@ -108,17 +133,25 @@ def test_model_training():
         print(f"✗ Error in model training: {e}")
         return False
 
+def _api_server_up(base_url):
+    """Cheap HEAD /health probe, so a down server doesn't cost the full test timeouts"""
+    try:
+        SESSION.head(f"{base_url}/health", timeout=2)
+        return True
+    except requests.exceptions.RequestException:
+        return False
+
 def test_api_endpoints():
     """Test API endpoints"""
     print("\nTesting API endpoints...")
     
-    base_url = "http://localhost:5000"
+    base_url = API_BASE_URL
     
     # Test health endpoint
     try:
-        response = requests.get(f"{base_url}/health", timeout=5)
+        response = SESSION.get(f"{base_url}/health", timeout=5)
         if response.status_code == 200:
-            health_data = response.json()
+            health_data = response_json(response)
             print("✓ Health endpoint working")
             print(f"  Model loaded: {health_data.get('model_loaded', False)}")
             print(f"  Preprocessor loaded: {health_data.get('preprocessor_loaded', False)}")
@@ -140,14 +173,14 @@ def test_api_endpoints():
             "crime_type": "Sexual Harassment"
         }
         
-        response = requests.post(
+        response = SESSION.post(
             f"{base_url}/predict",
             json=test_data,
             timeout=10
         )
         
         if response.status_code == 200:
-            prediction_data = response.json()
+            prediction_data = response_json(response)
             print("✓ Prediction endpoint working")
             print(f"  Prediction: {prediction_data.get('prediction')}")
             print(f"  Confidence: {prediction_data.get('confidence')}")
@@ -183,7 +216,8 @@ def test_model_files():
     
     # Test loading model
     try:
-        model = joblib.load(model_path)
+        # Only the type is checked, so map the tree arrays instead of reading them into memory
+        model = joblib.load(model_path, mmap_mode='r')
         print("✓ Model file can be loaded")
         print(f"  Model type: {type(model).__name__}")
     except Exception as e:
@@ -252,6 +286,11 @@ def run_comprehensive_test():
         ("API Endpoints", test_api_endpoints),
     ]
     
+    if not _api_server_up(API_BASE_URL):
+        print(f"\n⚠ API server not reachable at {API_BASE_URL}; skipping the API endpoint tests")
+        print("  Start the API server with: python api/app.py")
+        tests[-1] = ("API Endpoints (SKIPPED: server down)", lambda: False)
+    
     results = []
     for test_name, test_func in tests:
         try:
@@ -285,5 +324,6 @@ def run_comprehensive_test():
     return passed == total
 
 if __name__ == "__main__":
-    success = run_comprehensive_test()
-    sys.exit(0 if success else 1) 
\ No newline at end of file
+    with SESSION:
+        success = run_comprehensive_test()
+    sys.exit(0 if success else 1)
\ No newline at end of file
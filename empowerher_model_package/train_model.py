@@ -91,7 +91,8 @@ def save_model_and_preprocessor(model, preprocessor, model_path, preprocessor_pa
         os.makedirs(os.path.dirname(model_path), exist_ok=True)
         
         # Save model
-        joblib.dump(model, model_path)
+        # Uncompressed, protocol 5: the serving code memory-maps this file
+        joblib.dump(model, model_path, compress=0, protocol=5)
         print(f"Model saved to {model_path}")
         
         # Save preprocessor
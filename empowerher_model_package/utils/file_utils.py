@@ -0,0 +1,26 @@
+import os
+from contextlib import contextmanager
+
+@contextmanager
+def atomic_write(path, suffix='.tmp'):
+    """
+    Yield a temporary path next to path, swapped into place once the block succeeds
+
+    Readers see either the old file or the complete new one, never a torn
+    write. If the block raises, the temporary file is removed and path is
+    left untouched.
+
+    Args:
+        path (str): File to write
+        suffix (str): Appended to path for the temporary file; np.savez needs it to end in .npz
+    """
+    tmp_path = path + suffix
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
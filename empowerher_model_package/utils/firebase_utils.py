@@ -5,6 +5,16 @@ import os
 from datetime import datetime
 import pandas as pd
 
+# Keywords looked for in feedback suggestions, in priority order (first match wins)
+SUGGESTION_TIME_PERIODS = ('night', 'evening', 'morning')
+SUGGESTION_CRIME_TYPES = (
+    'sexual harassment', 'kidnapping', 'murder', 'assault',
+    'chain snatching', 'robbery', 'domestic violence', 'theft',
+    'burglary', 'vandalism', 'drug abuse', 'illegal gambling'
+)
+
+FIRESTORE_BATCH_LIMIT = 500  # Most writes Firestore accepts in one batch
+
 class FirebaseManager:
     def __init__(self, service_account_path=None):
         """Initialize Firebase connection"""
@@ -79,6 +89,41 @@ class FirebaseManager:
         
         return new_bad_feedbacks
     
+    def watch_new_bad_feedbacks(self, callback, collection_name='feedbacks'):
+        """
+        Call callback with each batch of unprocessed 'Bad' feedbacks as Firestore delivers them
+        
+        The first batch holds every unprocessed feedback already stored; later
+        batches hold only the feedbacks added since. The callback runs on
+        Firestore's listener thread. Call unsubscribe() on the returned watch
+        to stop listening.
+        """
+        if not self.is_initialized:
+            print("Firebase not initialized")
+            return None
+        
+        def on_snapshot(docs, changes, read_time):
+            new_bad_feedbacks = []
+            for change in changes:
+                # Our own processed marks come back as modifications; only additions are new
+                if change.type.name != 'ADDED':
+                    continue
+                feedback = change.document.to_dict()
+                if feedback.get('processed'):
+                    continue
+                feedback['id'] = change.document.id
+                new_bad_feedbacks.append(feedback)
+            
+            if new_bad_feedbacks:
+                callback(new_bad_feedbacks)
+        
+        try:
+            query = self.db.collection(collection_name).where('feedback', '==', 'Bad')
+            return query.on_snapshot(on_snapshot)
+        except Exception as e:
+            print(f"Error watching feedbacks: {e}")
+            return None
+    
     def mark_feedback_processed(self, feedback_id, collection_name='feedbacks'):
         """Mark a feedback as processed by adding a processed timestamp"""
         if not self.is_initialized:
@@ -96,6 +141,30 @@ class FirebaseManager:
             print(f"Error marking feedback as processed: {e}")
             return False
     
+    def mark_feedbacks_processed(self, feedback_ids, collection_name='feedbacks'):
+        """Mark many feedbacks as processed with batched writes instead of one update each"""
+        if not self.is_initialized:
+            print("Firebase not initialized")
+            return False
+        
+        try:
+            update = {
+                'processed_at': datetime.now().isoformat(),
+                'processed': True
+            }
+            collection = self.db.collection(collection_name)
+            
+            # Firestore caps a write batch at 500 operations
+            for start in range(0, len(feedback_ids), FIRESTORE_BATCH_LIMIT):
+                batch = self.db.batch()
+                for feedback_id in feedback_ids[start:start + FIRESTORE_BATCH_LIMIT]:
+                    batch.update(collection.document(feedback_id), update)
+                batch.commit()
+            return True
+        except Exception as e:
+            print(f"Error marking feedbacks as processed: {e}")
+            return False
+    
     def parse_feedback_suggestion(self, feedback):
         """Parse feedback suggestion to extract actionable information"""
         suggestion = feedback.get('suggestion', '')
@@ -118,31 +187,24 @@ class FirebaseManager:
             suggestion_lower = suggestion.lower()
             
             # Extract time information
-            if 'night' in suggestion_lower or 'night time' in suggestion_lower:
-                parsed_data['extracted_info']['time_period'] = 'night'
-            elif 'evening' in suggestion_lower:
-                parsed_data['extracted_info']['time_period'] = 'evening'
-            elif 'morning' in suggestion_lower:
-                parsed_data['extracted_info']['time_period'] = 'morning'
+            for time_period in SUGGESTION_TIME_PERIODS:
+                if time_period in suggestion_lower:
+                    parsed_data['extracted_info']['time_period'] = time_period
+                    break
             
             # Extract location information
             if 'ps' in suggestion_lower or 'police station' in suggestion_lower:
-                # Extract police station name
+                # Extract police station name; lowercasing never adds whitespace,
+                # so the lowered words line up with the original ones
                 words = suggestion.split()
-                for i, word in enumerate(words):
-                    if 'ps' in word.lower() or 'police' in word.lower():
+                for i, word in enumerate(suggestion_lower.split()):
+                    if 'ps' in word or 'police' in word:
                         if i > 0:
                             parsed_data['extracted_info']['police_station'] = words[i-1]
                         break
             
             # Extract crime type if mentioned
-            crime_types = [
-                'sexual harassment', 'kidnapping', 'murder', 'assault',
-                'chain snatching', 'robbery', 'domestic violence', 'theft',
-                'burglary', 'vandalism', 'drug abuse', 'illegal gambling'
-            ]
-            
-            for crime in crime_types:
+            for crime in SUGGESTION_CRIME_TYPES:
                 if crime in suggestion_lower:
                     parsed_data['extracted_info']['crime_type'] = crime
                     break
@@ -151,28 +213,42 @@ class FirebaseManager:
     
     def create_training_data_from_feedback(self, feedbacks):
         """Create training data from feedback for model retraining"""
-        training_data = []
+        # Collected column by column, so the frame is built once without per-row dicts
+        crime_ids = []
+        crime_types = []
+        latitudes = []
+        longitudes = []
+        times = []
+        police_stations = []
         
         for feedback in feedbacks:
             parsed = self.parse_feedback_suggestion(feedback)
             
             # Create a new data point based on feedback
             if parsed['lat'] and parsed['lon']:
-                new_data_point = {
-                    'Crime_ID': f"feedback_{feedback['id']}",
-                    'Crime_Type': parsed['crime_type'] or parsed['extracted_info'].get('crime_type', 'Unknown'),
-                    'Location': 'Feedback Location',
-                    'Latitude': parsed['lat'],
-                    'Longitude': parsed['lon'],
-                    'Date': datetime.now().strftime('%Y-%m-%d'),
-                    'Time': parsed['time'] or '12:00',
-                    'Severity': 4,  # High severity for bad feedback
-                    'Police_Station': parsed['extracted_info'].get('police_station', 'Unknown PS')
-                }
-                
-                training_data.append(new_data_point)
-        
-        return pd.DataFrame(training_data) if training_data else pd.DataFrame()
+                crime_ids.append(f"feedback_{feedback['id']}")
+                crime_types.append(parsed['crime_type'] or parsed['extracted_info'].get('crime_type', 'Unknown'))
+                latitudes.append(parsed['lat'])
+                longitudes.append(parsed['lon'])
+                times.append(parsed['time'] or '12:00')
+                police_stations.append(parsed['extracted_info'].get('police_station', 'Unknown PS'))
+        
+        if not crime_ids:
+            return pd.DataFrame()
+        
+        # Every row gets the same date, location and severity
+        n_rows = len(crime_ids)
+        return pd.DataFrame({
+            'Crime_ID': crime_ids,
+            'Crime_Type': crime_types,
+            'Location': ['Feedback Location'] * n_rows,
+            'Latitude': latitudes,
+            'Longitude': longitudes,
+            'Date': [datetime.now().strftime('%Y-%m-%d')] * n_rows,
+            'Time': times,
+            'Severity': [4] * n_rows,  # High severity for bad feedback
+            'Police_Station': police_stations
+        })
     
     def test_connection(self):
         """Test Firebase connection"""
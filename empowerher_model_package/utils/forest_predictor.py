@@ -0,0 +1,146 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba is optional; the trees are then scored by scikit-learn
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+TREE_LEAF = -1  # children_left value of a leaf node, as in sklearn.tree._tree
+
+@njit(cache=True)
+def _forest_proba(X, feature, threshold, children_left, children_right, missing_go_to_left, value, proba):
+    """Walk every tree for every row of X, accumulating leaf probabilities into proba"""
+    n_trees = feature.shape[0]
+    for i in range(X.shape[0]):
+        for t in range(n_trees):
+            node = 0
+            while children_left[t, node] != TREE_LEAF:
+                x = X[i, feature[t, node]]
+                # Same branching rule as DecisionTreeClassifier, missing values included
+                if np.isnan(x):
+                    go_left = missing_go_to_left[t, node]
+                else:
+                    go_left = x <= threshold[t, node]
+                node = children_left[t, node] if go_left else children_right[t, node]
+            proba[i] += value[t, node]
+        proba[i] /= n_trees
+
+class ForestPredictor:
+    def __init__(self, model):
+        """
+        Score feature rows against a fitted classifier with minimal per-call overhead
+
+        For a RandomForestClassifier the trees are scored directly, skipping the
+        input validation and joblib dispatch that predict_proba repeats on every
+        call. When Numba is installed the tree arrays are stacked once and walked
+        by a compiled loop; any other model is passed through to its own
+        predict_proba.
+
+        Args:
+            model: Fitted classifier
+        """
+        self.model = model
+        self.classes_ = model.classes_
+        self._estimators = list(model.estimators_) if isinstance(model, RandomForestClassifier) else None
+        self._tree_arrays = None
+        if self._estimators is not None and NUMBA_AVAILABLE and model.n_outputs_ == 1:
+            self._tree_arrays = self._stack_trees(self._estimators, len(self.classes_))
+
+            # Compile the kernel now so the first request doesn't pay for it
+            self.predict_proba(np.zeros((1, model.n_features_in_), dtype=np.float32))
+
+    @staticmethod
+    def _stack_trees(estimators, n_classes):
+        """
+        Stack the per-tree node arrays into (n_trees, max_nodes) arrays
+
+        Shorter trees are padded with leaves that are never reached.
+
+        Args:
+            estimators (list): Fitted DecisionTreeClassifier trees
+            n_classes (int): Number of classes
+
+        Returns:
+            tuple: feature, threshold, children_left, children_right, missing_go_to_left, value
+        """
+        trees = [estimator.tree_ for estimator in estimators]
+        shape = (len(trees), max(tree.node_count for tree in trees))
+
+        # Node and feature indices fit in int32, halving the index bytes each walk reads;
+        # thresholds and leaf values stay float64 so results match scikit-learn exactly
+        feature = np.zeros(shape, dtype=np.int32)
+        threshold = np.zeros(shape, dtype=np.float64)
+        children_left = np.full(shape, TREE_LEAF, dtype=np.int32)
+        children_right = np.full(shape, TREE_LEAF, dtype=np.int32)
+        missing_go_to_left = np.zeros(shape, dtype=np.bool_)
+        value = np.zeros(shape + (n_classes,), dtype=np.float64)
+
+        for t, tree in enumerate(trees):
+            n = tree.node_count
+            feature[t, :n] = tree.feature
+            threshold[t, :n] = tree.threshold
+            children_left[t, :n] = tree.children_left
+            children_right[t, :n] = tree.children_right
+            # Trees fitted before scikit-learn 1.3 send missing values right
+            if hasattr(tree, 'missing_go_to_left'):
+                missing_go_to_left[t, :n] = tree.missing_go_to_left
+            leaf_value = tree.value[:, 0, :n_classes]
+
+            # scikit-learn < 1.4 stored class counts and normalized them in predict_proba
+            normalizer = leaf_value.sum(axis=1, keepdims=True)
+            if not np.allclose(normalizer, 1.0):
+                normalizer[normalizer == 0.0] = 1.0
+                leaf_value = leaf_value / normalizer
+            value[t, :n] = leaf_value
+
+        return feature, threshold, children_left, children_right, missing_go_to_left, value
+
+    def predict_proba(self, features):
+        """
+        Get class probabilities, identical to model.predict_proba
+
+        Args:
+            features (np.array): Array of shape (n_rows, n_features)
+
+        Returns:
+            np.array: Class probabilities of shape (n_rows, n_classes)
+        """
+        if self._estimators is None:
+            return self.model.predict_proba(features)
+
+        # Trees split on float32 values; the preprocessor already produces them
+        X = np.ascontiguousarray(features, dtype=np.float32)
+
+        if self._tree_arrays is not None:
+            proba = np.zeros((X.shape[0], len(self.classes_)), dtype=np.float64)
+            _forest_proba(X, *self._tree_arrays, proba)
+            return proba
+
+        # Same accumulation order as RandomForestClassifier.predict_proba
+        proba = self._estimators[0].predict_proba(X, check_input=False)
+        for estimator in self._estimators[1:]:
+            proba += estimator.predict_proba(X, check_input=False)
+        proba /= len(self._estimators)
+        return proba
+
+    def predict_one(self, features):
+        """
+        Get (predicted class, class probabilities) for a single feature row
+
+        Args:
+            features (np.array): Array of shape (1, n_features)
+
+        Returns:
+            tuple: Predicted class and its probability row
+        """
+        proba = self.predict_proba(features)[0]
+
+        # Same rule RandomForestClassifier.predict applies to the probabilities
+        return self.classes_[proba.argmax()], proba
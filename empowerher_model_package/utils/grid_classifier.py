@@ -1,10 +1,105 @@
 import pandas as pd
 import numpy as np
-from sklearn.cluster import DBSCAN
 from sklearn.preprocessing import StandardScaler
-import folium
-from folium import plugins
-import json
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba is optional; create_grid then buckets with pandas instead
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Risk zone names, indexed by the integer codes stored in the zone raster
+RISK_ZONE_NAMES = ('low_risk', 'medium_risk', 'high_risk')
+LOW_RISK, MEDIUM_RISK, HIGH_RISK = range(len(RISK_ZONE_NAMES))
+UNKNOWN_ZONE = -1  # Outside the classified grid
+
+# Index -1 (UNKNOWN_ZONE) picks the trailing 'unknown' label
+RISK_ZONE_LABELS = RISK_ZONE_NAMES + ('unknown',)
+
+@njit(cache=True)
+def _lookup(latitude, longitude, origin_lat, origin_lon, grid_size, grid):
+    """Return grid[row, col] for the cell containing a location, or -1 outside the grid"""
+    offset_lat = (latitude - origin_lat) / grid_size
+    offset_lon = (longitude - origin_lon) / grid_size
+    
+    # Truncation toward zero maps (-1, 0) to cell 0, as int() does
+    if not (-1.0 < offset_lat < grid.shape[0] and -1.0 < offset_lon < grid.shape[1]):
+        return -1
+    return grid[int(offset_lat), int(offset_lon)]
+
+@njit(cache=True)
+def _within_radius(center_lats, center_lons, latitude, longitude, radius_deg):
+    """Mask of cells whose center lies within radius_deg (planar degrees) of a location"""
+    mask = np.empty(len(center_lats), dtype=np.bool_)
+    for i in range(len(center_lats)):
+        d_lat = center_lats[i] - latitude
+        d_lon = center_lons[i] - longitude
+        mask[i] = np.sqrt(d_lat ** 2 + d_lon ** 2) <= radius_deg
+    return mask
+
+@njit(cache=True)
+def _bucket(latitudes, longitudes, severities, lat_bins, lon_bins):
+    """
+    Assign crimes to grid cells and aggregate them per cell
+    
+    Each axis is binned like pd.cut(right=True, labels=False): a value on the
+    lowest bin edge or outside the bins gets bin -1, and the crime is only
+    aggregated when both bins are valid. Coordinate sums use Kahan summation,
+    as pandas' groupby mean does, so centers match it exactly.
+    
+    Returns:
+        tuple: Per-row latitude and longitude bins, then per-cell (row-major
+            over lat/lon bins) crime count, severity sum, severity max,
+            latitude sum and longitude sum
+    """
+    n_lat = len(lat_bins) - 1
+    n_lon = len(lon_bins) - 1
+    n_cells = n_lat * n_lon
+    
+    row_lat = np.empty(len(latitudes), dtype=np.int64)
+    row_lon = np.empty(len(latitudes), dtype=np.int64)
+    counts = np.zeros(n_cells, dtype=np.int64)
+    severity_sum = np.zeros(n_cells, dtype=np.float64)
+    severity_max = np.zeros(n_cells, dtype=severities.dtype)
+    lat_sum = np.zeros(n_cells, dtype=np.float64)
+    lat_comp = np.zeros(n_cells, dtype=np.float64)
+    lon_sum = np.zeros(n_cells, dtype=np.float64)
+    lon_comp = np.zeros(n_cells, dtype=np.float64)
+    
+    for i in range(len(latitudes)):
+        grid_lat = np.searchsorted(lat_bins, latitudes[i]) - 1
+        grid_lon = np.searchsorted(lon_bins, longitudes[i]) - 1
+        if grid_lat >= n_lat:
+            grid_lat = -1
+        if grid_lon >= n_lon:
+            grid_lon = -1
+        row_lat[i] = grid_lat
+        row_lon[i] = grid_lon
+        if grid_lat < 0 or grid_lon < 0:
+            continue
+        
+        cell = grid_lat * n_lon + grid_lon
+        if counts[cell] == 0 or severities[i] > severity_max[cell]:
+            severity_max[cell] = severities[i]
+        counts[cell] += 1
+        severity_sum[cell] += severities[i]
+        
+        y = latitudes[i] - lat_comp[cell]
+        t = lat_sum[cell] + y
+        lat_comp[cell] = t - lat_sum[cell] - y
+        lat_sum[cell] = t
+        
+        y = longitudes[i] - lon_comp[cell]
+        t = lon_sum[cell] + y
+        lon_comp[cell] = t - lon_sum[cell] - y
+        lon_sum[cell] = t
+    
+    return row_lat, row_lon, counts, severity_sum, severity_max, lat_sum, lon_sum
 
 class GridClassifier:
     def __init__(self, grid_size=0.01):  # 0.01 degrees ≈ 1.1 km
@@ -18,13 +113,19 @@ class GridClassifier:
         self.grid_data = None
         self.risk_zones = None
         self.scaler = StandardScaler()
+        self.zone_grid = None
+        self.cell_grid = None
+        self.cell_columns = None
+        self.origin_lat = None
+        self.origin_lon = None
         
     def create_grid(self, crime_data):
         """
         Create grid from crime data and classify each grid cell
         
         Args:
-            crime_data (pd.DataFrame): Crime data with Latitude, Longitude, Crime_Type, Severity
+            crime_data (pd.DataFrame or dict): Crime data with Latitude, Longitude, Crime_Type,
+                Severity columns; a dict of numpy arrays works as well
             
         Returns:
             dict: Grid classification results
@@ -41,22 +142,11 @@ class GridClassifier:
         lat_bins = np.arange(min_lat, max_lat + self.grid_size, self.grid_size)
         lon_bins = np.arange(min_lon, max_lon + self.grid_size, self.grid_size)
         
-        # Assign crimes to grid cells
-        crime_data['grid_lat'] = pd.cut(crime_data['Latitude'], bins=lat_bins, labels=False)
-        crime_data['grid_lon'] = pd.cut(crime_data['Longitude'], bins=lon_bins, labels=False)
-        
-        # Group crimes by grid cell
-        grid_stats = crime_data.groupby(['grid_lat', 'grid_lon']).agg({
-            'Crime_ID': 'count',  # Total crimes
-            'Severity': ['mean', 'max'],  # Average and max severity
-            'Crime_Type': lambda x: list(x),  # List of crime types
-            'Latitude': 'mean',  # Center latitude of grid
-            'Longitude': 'mean'  # Center longitude of grid
-        }).reset_index()
-        
-        # Flatten column names
-        grid_stats.columns = ['grid_lat', 'grid_lon', 'crime_count', 'avg_severity', 
-                            'max_severity', 'crime_types', 'center_lat', 'center_lon']
+        if NUMBA_AVAILABLE:
+            grid_stats = self._bucket_grid_stats(crime_data, lat_bins, lon_bins)
+        else:
+            # As plain Python the per-crime loop is slower than pandas' vectorized groupby
+            grid_stats = self._pandas_grid_stats(crime_data, lat_bins, lon_bins)
         
         # Calculate risk score for each grid
         grid_stats['risk_score'] = self._calculate_risk_score(grid_stats)
@@ -65,8 +155,123 @@ class GridClassifier:
         grid_stats['risk_zone'] = self._classify_risk_zones(grid_stats['risk_score'])
         
         self.grid_data = grid_stats
+        self._build_zone_grid()
         return self._get_grid_summary()
     
+    def _bucket_grid_stats(self, crime_data, lat_bins, lon_bins):
+        """
+        Per-cell statistics, one row per occupied cell, from the compiled _bucket pass
+        
+        Args:
+            crime_data (pd.DataFrame or dict): Crime data; gets grid_lat/grid_lon columns
+            lat_bins (np.array): Latitude bin edges
+            lon_bins (np.array): Longitude bin edges
+            
+        Returns:
+            pd.DataFrame: Grid statistics
+        """
+        # Assign crimes to grid cells and aggregate each cell in one compiled pass
+        row_lat, row_lon, counts, severity_sum, severity_max, lat_sum, lon_sum = _bucket(
+            np.asarray(crime_data['Latitude'], dtype=np.float64),
+            np.asarray(crime_data['Longitude'], dtype=np.float64),
+            np.asarray(crime_data['Severity'], dtype=np.int64),
+            lat_bins, lon_bins
+        )
+        crime_data['grid_lat'] = np.where(row_lat >= 0, row_lat, np.nan)
+        crime_data['grid_lon'] = np.where(row_lon >= 0, row_lon, np.nan)
+        
+        # Crime types per cell, in row order, by splitting a stable sort on cell id
+        n_lon_cells = len(lon_bins) - 1
+        in_grid = (row_lat >= 0) & (row_lon >= 0)
+        cell_ids = row_lat[in_grid] * n_lon_cells + row_lon[in_grid]
+        crime_types = np.asarray(crime_data['Crime_Type'])[in_grid][np.argsort(cell_ids, kind='stable')]
+        occupied = np.flatnonzero(counts)
+        cell_counts = counts[occupied]
+        
+        # One row per occupied cell, ordered by (grid_lat, grid_lon) like groupby
+        grid_stats = pd.DataFrame({
+            'grid_lat': (occupied // n_lon_cells).astype(np.float64),
+            'grid_lon': (occupied % n_lon_cells).astype(np.float64),
+            'crime_count': cell_counts,
+            'avg_severity': severity_sum[occupied] / cell_counts,
+            'max_severity': severity_max[occupied],
+            'crime_types': [types.tolist() for types in np.split(crime_types, np.cumsum(cell_counts)[:-1])],
+            'center_lat': lat_sum[occupied] / cell_counts,
+            'center_lon': lon_sum[occupied] / cell_counts
+        })
+        return grid_stats
+    
+    def _pandas_grid_stats(self, crime_data, lat_bins, lon_bins):
+        """
+        Same statistics as _bucket_grid_stats, computed with pd.cut and groupby
+        
+        Args:
+            crime_data (pd.DataFrame or dict): Crime data; gets grid_lat/grid_lon columns
+            lat_bins (np.array): Latitude bin edges
+            lon_bins (np.array): Longitude bin edges
+            
+        Returns:
+            pd.DataFrame: Grid statistics
+        """
+        crimes = pd.DataFrame({
+            column: np.asarray(crime_data[column])
+            for column in ['Latitude', 'Longitude', 'Severity', 'Crime_Type']
+        })
+        
+        # Assign crimes to grid cells
+        crimes['grid_lat'] = pd.cut(crimes['Latitude'], bins=lat_bins, labels=False)
+        crimes['grid_lon'] = pd.cut(crimes['Longitude'], bins=lon_bins, labels=False)
+        crime_data['grid_lat'] = crimes['grid_lat'].to_numpy()
+        crime_data['grid_lon'] = crimes['grid_lon'].to_numpy()
+        
+        # Group crimes by grid cell
+        return crimes.groupby(['grid_lat', 'grid_lon']).agg(
+            crime_count=('Severity', 'size'),
+            avg_severity=('Severity', 'mean'),
+            max_severity=('Severity', 'max'),
+            crime_types=('Crime_Type', list),
+            center_lat=('Latitude', 'mean'),
+            center_lon=('Longitude', 'mean')
+        ).reset_index()
+    
+    def _build_zone_grid(self):
+        """
+        Build dense rasters indexed by [grid_lat, grid_lon]
+        
+        zone_grid holds int8 risk zone codes and cell_grid the matching row of
+        grid_data; cells without crimes hold UNKNOWN_ZONE / -1. The origin is
+        the minimum cell center, which every lookup measures from.
+        """
+        grid_lat = self.grid_data['grid_lat'].to_numpy(dtype=np.int64)
+        grid_lon = self.grid_data['grid_lon'].to_numpy(dtype=np.int64)
+        zone_codes = np.array(
+            [RISK_ZONE_NAMES.index(zone) for zone in self.grid_data['risk_zone']],
+            dtype=np.int8
+        )
+        
+        zone_grid = np.full((grid_lat.max() + 1, grid_lon.max() + 1), UNKNOWN_ZONE, dtype=np.int8)
+        zone_grid[grid_lat, grid_lon] = zone_codes
+        cell_grid = np.full(zone_grid.shape, -1, dtype=np.int32)
+        cell_grid[grid_lat, grid_lon] = np.arange(len(self.grid_data), dtype=np.int32)
+        
+        self.zone_grid = zone_grid
+        self.cell_grid = cell_grid
+        self.origin_lat = float(self.grid_data['center_lat'].min())
+        self.origin_lon = float(self.grid_data['center_lon'].min())
+        self.cell_columns = {
+            column: self.grid_data[column].to_numpy()
+            for column in ['center_lat', 'center_lon', 'risk_zone', 'risk_score', 'crime_count',
+                           'avg_severity', 'max_severity', 'crime_types']
+        }
+        
+        # Compile the kernels now so the first request doesn't pay for it
+        _lookup(self.origin_lat, self.origin_lon, self.origin_lat, self.origin_lon,
+                self.grid_size, self.cell_grid)
+        _lookup(self.origin_lat, self.origin_lon, self.origin_lat, self.origin_lon,
+                self.grid_size, self.zone_grid)
+        _within_radius(self.cell_columns['center_lat'], self.cell_columns['center_lon'],
+                       self.origin_lat, self.origin_lon, 0.0)
+    
     def _calculate_risk_score(self, grid_stats):
         """
         Calculate risk score for each grid cell
@@ -132,6 +337,22 @@ class GridClassifier:
         
         return summary
     
+    def get_zone_code(self, latitude, longitude):
+        """
+        Get the risk zone code for a single location
+        
+        Args:
+            latitude (float): Location latitude
+            longitude (float): Location longitude
+            
+        Returns:
+            int: Code indexing RISK_ZONE_NAMES, UNKNOWN_ZONE outside the grid
+        """
+        if self.zone_grid is None:
+            return UNKNOWN_ZONE
+        return int(_lookup(latitude, longitude, self.origin_lat, self.origin_lon,
+                           self.grid_size, self.zone_grid))
+    
     def check_location_in_grid(self, latitude, longitude):
         """
         Check which risk zone a location falls into
@@ -146,17 +367,11 @@ class GridClassifier:
         if self.grid_data is None:
             return {'error': 'Grid not initialized. Run create_grid() first.'}
         
-        # Find the grid cell for the location
-        grid_lat = int((latitude - self.grid_data['center_lat'].min()) / self.grid_size)
-        grid_lon = int((longitude - self.grid_data['center_lon'].min()) / self.grid_size)
-        
-        # Find matching grid
-        matching_grid = self.grid_data[
-            (self.grid_data['grid_lat'] == grid_lat) & 
-            (self.grid_data['grid_lon'] == grid_lon)
-        ]
+        # Find the grid cell for the location with the compiled raster lookup
+        cell = int(_lookup(latitude, longitude, self.origin_lat, self.origin_lon,
+                           self.grid_size, self.cell_grid))
         
-        if len(matching_grid) == 0:
+        if cell < 0:
             return {
                 'location': {'latitude': latitude, 'longitude': longitude},
                 'risk_zone': 'unknown',
@@ -164,19 +379,47 @@ class GridClassifier:
                 'message': 'Location not in classified grid area'
             }
         
-        grid_info = matching_grid.iloc[0]
+        columns = self.cell_columns
         
         return {
             'location': {'latitude': latitude, 'longitude': longitude},
-            'grid_center': {'latitude': grid_info['center_lat'], 'longitude': grid_info['center_lon']},
-            'risk_zone': grid_info['risk_zone'],
-            'risk_score': float(grid_info['risk_score']),
-            'crime_count': int(grid_info['crime_count']),
-            'avg_severity': float(grid_info['avg_severity']),
-            'max_severity': int(grid_info['max_severity']),
-            'crime_types': grid_info['crime_types']
+            'grid_center': {'latitude': float(columns['center_lat'][cell]),
+                            'longitude': float(columns['center_lon'][cell])},
+            'risk_zone': columns['risk_zone'][cell],
+            'risk_score': float(columns['risk_score'][cell]),
+            'crime_count': int(columns['crime_count'][cell]),
+            'avg_severity': float(columns['avg_severity'][cell]),
+            'max_severity': int(columns['max_severity'][cell]),
+            'crime_types': columns['crime_types'][cell]
         }
     
+    def check_locations_in_grid(self, latitudes, longitudes):
+        """
+        Look up the risk zone codes for many locations at once
+        
+        Args:
+            latitudes (np.array): Location latitudes
+            longitudes (np.array): Location longitudes
+            
+        Returns:
+            np.array: int8 zone codes indexing RISK_ZONE_NAMES, UNKNOWN_ZONE outside the grid
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        zones = np.full(latitudes.shape, UNKNOWN_ZONE, dtype=np.int8)
+        if self.zone_grid is None:
+            return zones
+        
+        # Truncate toward zero like int() in check_location_in_grid
+        grid_lat = np.trunc((latitudes - self.origin_lat) / self.grid_size)
+        grid_lon = np.trunc((longitudes - self.origin_lon) / self.grid_size)
+        
+        n_lat, n_lon = self.zone_grid.shape
+        inside = (grid_lat >= 0) & (grid_lat < n_lat) & (grid_lon >= 0) & (grid_lon < n_lon)
+        zones[inside] = self.zone_grid[grid_lat[inside].astype(np.int64), grid_lon[inside].astype(np.int64)]
+        
+        return zones
+    
     def create_risk_map(self, output_file='risk_zones_map.html'):
         """
         Create an interactive map showing risk zones
@@ -190,6 +433,9 @@ class GridClassifier:
         if self.grid_data is None:
             return None
         
+        # Only map rendering needs folium; the functions don't install it
+        import folium
+        
         # Calculate map center
         center_lat = self.grid_data['center_lat'].mean()
         center_lon = self.grid_data['center_lon'].mean()
@@ -263,10 +509,10 @@ class GridClassifier:
         radius_deg = radius_km / 111
         
         # Find grids within radius
-        nearby_grids = self.grid_data[
-            ((self.grid_data['center_lat'] - latitude) ** 2 + 
-             (self.grid_data['center_lon'] - longitude) ** 2) ** 0.5 <= radius_deg
-        ]
+        nearby_grids = self.grid_data[_within_radius(
+            self.cell_columns['center_lat'], self.cell_columns['center_lon'],
+            float(latitude), float(longitude), float(radius_deg)
+        )]
         
         if len(nearby_grids) == 0:
             return {
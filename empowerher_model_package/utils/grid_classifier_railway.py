@@ -3,6 +3,53 @@ import numpy as np
 from sklearn.cluster import DBSCAN
 from sklearn.preprocessing import StandardScaler
 import json
+import os
+from enum import IntEnum
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the lookup kernel then runs as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+class RiskZone(IntEnum):
+    """Integer risk zone codes stored in the zone raster"""
+    UNKNOWN = -1  # Outside the classified grid
+    SAFE = 0
+    LOW_RISK = 1
+    MEDIUM_RISK = 2
+    HIGH_RISK = 3
+    CRITICAL = 4
+
+# Risk zone names, indexed by the integer codes stored in the zone raster
+RISK_ZONE_NAMES = ('safe', 'low_risk', 'medium_risk', 'high_risk', 'critical')
+UNKNOWN_ZONE = RiskZone.UNKNOWN
+
+# Index -1 (UNKNOWN) picks the trailing 'unknown' label
+RISK_ZONE_LABELS = RISK_ZONE_NAMES + ('unknown',)
+
+def zone_to_string(code):
+    """Return the risk zone name for a zone code, 'unknown' outside the grid"""
+    return RISK_ZONE_LABELS[code]
+
+# grid_data columns, in the order create_grid builds them; all but the list and
+# string columns are stored as-is by save_grid
+GRID_COLUMNS = ['grid_lat', 'grid_lon', 'crime_count', 'avg_severity', 'max_severity',
+                'crime_types', 'center_lat', 'center_lon', 'risk_score', 'risk_zone']
+GRID_NUMERIC_COLUMNS = [column for column in GRID_COLUMNS if column not in ('crime_types', 'risk_zone')]
+
+@njit(cache=True)
+def _lookup(latitude, longitude, origin_lat, origin_lon, grid_size, grid):
+    """Return grid[row, col] for the cell containing a location, or -1 outside the grid"""
+    offset_lat = (latitude - origin_lat) / grid_size
+    offset_lon = (longitude - origin_lon) / grid_size
+    
+    # Truncation toward zero maps (-1, 0) to cell 0, as int() does in check_location
+    if not (-1.0 < offset_lat < grid.shape[0] and -1.0 < offset_lon < grid.shape[1]):
+        return -1
+    return grid[int(offset_lat), int(offset_lon)]
 
 class GridClassifier:
     def __init__(self, grid_size=0.01):  # 0.01 degrees ≈ 1.1 km
@@ -16,6 +63,11 @@ class GridClassifier:
         self.grid_data = None
         self.risk_zones = None
         self.scaler = StandardScaler()
+        self.zone_grid = None
+        self.cell_grid = None
+        self.cell_columns = None
+        self.origin_lat = None
+        self.origin_lon = None
         
     def create_grid(self, crime_data):
         """
@@ -63,8 +115,204 @@ class GridClassifier:
         grid_stats['risk_zone'] = self._classify_risk_zones(grid_stats['risk_score'])
         
         self.grid_data = grid_stats
+        self._build_zone_grid()
         return self._get_grid_summary()
     
+    def _build_zone_grid(self):
+        """
+        Build dense rasters indexed by [grid_lat, grid_lon]
+        
+        zone_grid holds int8 risk zone codes and cell_grid the matching row of
+        grid_data; cells without crimes hold UNKNOWN_ZONE / -1. The origin
+        matches the one used by check_location so all lookups resolve to the
+        same grid cell.
+        """
+        grid_lat = self.grid_data['grid_lat'].to_numpy(dtype=np.int64)
+        grid_lon = self.grid_data['grid_lon'].to_numpy(dtype=np.int64)
+        zone_codes = np.array(
+            [RISK_ZONE_NAMES.index(zone) for zone in self.grid_data['risk_zone']],
+            dtype=np.int8
+        )
+        
+        zone_grid = np.full((grid_lat.max() + 1, grid_lon.max() + 1), UNKNOWN_ZONE, dtype=np.int8)
+        zone_grid[grid_lat, grid_lon] = zone_codes
+        cell_grid = np.full(zone_grid.shape, -1, dtype=np.int32)
+        cell_grid[grid_lat, grid_lon] = np.arange(len(self.grid_data), dtype=np.int32)
+        
+        self.zone_grid = zone_grid
+        self.cell_grid = cell_grid
+        self.origin_lat = float(self.grid_data['center_lat'].min())
+        self.origin_lon = float(self.grid_data['center_lon'].min())
+        self._index_cells()
+    
+    def _index_cells(self):
+        """Pull the per-cell columns used by lookups out of grid_data and warm the lookup kernel"""
+        self.cell_columns = {
+            column: self.grid_data[column].to_numpy()
+            for column in ['center_lat', 'center_lon', 'risk_zone', 'risk_score', 'crime_count',
+                           'avg_severity', 'max_severity', 'crime_types']
+        }
+        
+        # Compile both raster specializations now so the first request doesn't pay for it
+        _lookup(self.origin_lat, self.origin_lon, self.origin_lat, self.origin_lon,
+                self.grid_size, self.zone_grid)
+        _lookup(self.origin_lat, self.origin_lon, self.origin_lat, self.origin_lon,
+                self.grid_size, self.cell_grid)
+    
+    def save_grid(self, filepath):
+        """
+        Save the classified grid and its rasters to an .npz cache
+        
+        Args:
+            filepath (str): Destination .npz path
+        """
+        if self.grid_data is None:
+            print("Grid not created yet, nothing to save")
+            return
+        
+        # crime_types holds a list per cell; store it flattened with per-cell offsets
+        crime_types = self.grid_data['crime_types'].tolist()
+        crime_type_offsets = np.cumsum([0] + [len(types) for types in crime_types])
+        
+        np.savez(
+            filepath,
+            grid_size=self.grid_size,
+            origin_lat=self.origin_lat,
+            origin_lon=self.origin_lon,
+            zone_grid=self.zone_grid,
+            cell_grid=self.cell_grid,
+            crime_types=np.array([crime_type for types in crime_types for crime_type in types], dtype=str),
+            crime_type_offsets=crime_type_offsets,
+            risk_zone=self.grid_data['risk_zone'].to_numpy(dtype=str),
+            **{column: self.grid_data[column].to_numpy() for column in GRID_NUMERIC_COLUMNS}
+        )
+        print(f"Grid saved to {filepath}")
+    
+    def load_grid(self, filepath, source_path=None):
+        """
+        Load a grid saved by save_grid instead of rebuilding it from crime data
+        
+        Args:
+            filepath (str): Path of the .npz cache
+            source_path (str): Crime data the grid is built from; a cache older
+                than this file is ignored
+            
+        Returns:
+            bool: True if the cache was loaded
+        """
+        if not os.path.exists(filepath):
+            return False
+        
+        if source_path is not None and os.path.getmtime(filepath) < os.path.getmtime(source_path):
+            print(f"Grid cache at {filepath} is older than {source_path}, ignoring it")
+            return False
+        
+        with np.load(filepath) as cache:
+            if float(cache['grid_size']) != self.grid_size:
+                print(f"Grid cache at {filepath} was built with another grid size, ignoring it")
+                return False
+            
+            flat_crime_types = cache['crime_types'].tolist()
+            offsets = cache['crime_type_offsets'].tolist()
+            grid_stats = pd.DataFrame({column: cache[column] for column in GRID_NUMERIC_COLUMNS})
+            grid_stats['crime_types'] = [
+                flat_crime_types[start:end] for start, end in zip(offsets[:-1], offsets[1:])
+            ]
+            grid_stats['risk_zone'] = cache['risk_zone'].tolist()
+            
+            self.zone_grid = cache['zone_grid']
+            self.cell_grid = cache['cell_grid']
+            self.origin_lat = float(cache['origin_lat'])
+            self.origin_lon = float(cache['origin_lon'])
+        
+        # Same column order as create_grid produces
+        self.grid_data = grid_stats[GRID_COLUMNS]
+        self._index_cells()
+        print(f"Grid loaded from {filepath}")
+        return True
+    
+    def get_zone_code(self, latitude, longitude):
+        """
+        Get the risk zone code for a single location
+        
+        Args:
+            latitude (float): Location latitude
+            longitude (float): Location longitude
+            
+        Returns:
+            int: Code indexing RISK_ZONE_NAMES, UNKNOWN_ZONE outside the grid
+        """
+        if self.zone_grid is None:
+            return UNKNOWN_ZONE
+        return int(_lookup(latitude, longitude, self.origin_lat, self.origin_lon,
+                           self.grid_size, self.zone_grid))
+    
+    def check_location_in_grid(self, latitude, longitude):
+        """
+        Check which risk zone a location falls into
+        
+        Args:
+            latitude (float): Location latitude
+            longitude (float): Location longitude
+            
+        Returns:
+            dict: Risk zone information for the location
+        """
+        if self.grid_data is None:
+            return {'error': 'Grid not initialized. Run create_grid() first.'}
+        
+        cell = int(_lookup(latitude, longitude, self.origin_lat, self.origin_lon,
+                           self.grid_size, self.cell_grid))
+        
+        if cell < 0:
+            return {
+                'location': {'latitude': latitude, 'longitude': longitude},
+                'risk_zone': 'unknown',
+                'risk_score': 0.0,
+                'message': 'Location not in classified grid area'
+            }
+        
+        columns = self.cell_columns
+        
+        return {
+            'location': {'latitude': latitude, 'longitude': longitude},
+            'grid_center': {'latitude': float(columns['center_lat'][cell]),
+                            'longitude': float(columns['center_lon'][cell])},
+            'risk_zone': columns['risk_zone'][cell],
+            'risk_score': float(columns['risk_score'][cell]),
+            'crime_count': int(columns['crime_count'][cell]),
+            'avg_severity': float(columns['avg_severity'][cell]),
+            'max_severity': int(columns['max_severity'][cell]),
+            'crime_types': columns['crime_types'][cell]
+        }
+    
+    def check_locations_in_grid(self, latitudes, longitudes):
+        """
+        Look up the risk zone codes for many locations at once
+        
+        Args:
+            latitudes (np.array): Location latitudes
+            longitudes (np.array): Location longitudes
+            
+        Returns:
+            np.array: int8 zone codes indexing RISK_ZONE_NAMES, UNKNOWN_ZONE outside the grid
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        zones = np.full(latitudes.shape, UNKNOWN_ZONE, dtype=np.int8)
+        if self.zone_grid is None:
+            return zones
+        
+        # Truncate toward zero like int() in check_location
+        grid_lat = np.trunc((latitudes - self.origin_lat) / self.grid_size)
+        grid_lon = np.trunc((longitudes - self.origin_lon) / self.grid_size)
+        
+        n_lat, n_lon = self.zone_grid.shape
+        inside = (grid_lat >= 0) & (grid_lat < n_lat) & (grid_lon >= 0) & (grid_lon < n_lon)
+        zones[inside] = self.zone_grid[grid_lat[inside].astype(np.int64), grid_lon[inside].astype(np.int64)]
+        
+        return zones
+    
     def _calculate_risk_score(self, grid_stats):
         """
         Calculate risk score for each grid cell
@@ -103,9 +351,8 @@ class GridClassifier:
         
         # Classify into zones
         zones = np.digitize(risk_scores, thresholds)
-        zone_names = ['safe', 'low_risk', 'medium_risk', 'high_risk', 'critical']
         
-        return [zone_names[zone] for zone in zones]
+        return [RISK_ZONE_NAMES[zone] for zone in zones]
     
     def _get_grid_summary(self):
         """
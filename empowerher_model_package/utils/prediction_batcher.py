@@ -0,0 +1,96 @@
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+class _PendingPrediction:
+    """A single feature row waiting for the batch worker"""
+    __slots__ = ('features', 'done', 'result', 'error')
+
+    def __init__(self, features):
+        self.features = features
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class PredictionBatcher:
+    def __init__(self, model, max_batch_size=32, max_wait=0.005):
+        """
+        Coalesce concurrent single-row predictions into one predict_proba call
+
+        Args:
+            model: Fitted classifier exposing predict_proba
+            max_batch_size (int): Most rows scored in one model call
+            max_wait (float): Seconds to wait for more rows after the first arrives
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._queue = None
+        self._worker = None
+        self._worker_pid = None
+
+    def _ensure_worker(self):
+        """Start the worker thread, once per process (threads don't survive a fork)"""
+        if self._worker_pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+                self._worker = threading.Thread(
+                    target=self._run, args=(self._queue,), name='prediction-batcher', daemon=True
+                )
+                self._worker.start()
+                self._worker_pid = os.getpid()
+
+    def predict_proba(self, features, timeout=1.0):
+        """
+        Get class probabilities for a single feature row
+
+        Args:
+            features (np.array): Array of shape (1, n_features)
+            timeout (float): Seconds to wait for the batch before scoring the row directly
+
+        Returns:
+            np.array: Class probabilities for the row
+        """
+        self._ensure_worker()
+
+        # Copy the row: callers may pass a buffer that is reused on their thread
+        pending = _PendingPrediction(np.array(features[0], copy=True))
+        self._queue.put(pending)
+
+        if not pending.done.wait(timeout):
+            return self.model.predict_proba(features)[0]
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _run(self, pending_queue):
+        """Drain the queue in batches of up to max_batch_size rows"""
+        while True:
+            batch = [pending_queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(pending_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                probas = self.model.predict_proba(np.vstack([pending.features for pending in batch]))
+                for pending, proba in zip(batch, probas):
+                    pending.result = proba
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            finally:
+                for pending in batch:
+                    pending.done.set()
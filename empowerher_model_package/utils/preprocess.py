@@ -3,26 +3,121 @@ import numpy as np
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from datetime import datetime
 import joblib
-import os
+import threading
+
+from utils.file_utils import atomic_write
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the time feature kernel then runs as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Per-thread scratch row reused by transform_one so single predictions don't allocate
+_thread_local = threading.local()
+
+# Police station assumed for prediction requests, which never carry one
+UNKNOWN_POLICE_STATION = 'Unknown PS'
+
+# Keys of the dicts returned by extract_time_features / extract_date_features
+TIME_FEATURE_COLUMNS = ['hour', 'minute', 'is_night', 'is_evening', 'is_morning', 'is_afternoon']
+DATE_FEATURE_COLUMNS = ['day_of_week', 'month', 'day', 'is_weekend']
+
+# Feature columns before the encoded categories: Latitude, Longitude, Severity,
+# then the time and date features; the date features end the block
+N_BASE_FEATURES = 3 + len(TIME_FEATURE_COLUMNS) + len(DATE_FEATURE_COLUMNS)
+DATE_FEATURE_SLICE = slice(N_BASE_FEATURES - len(DATE_FEATURE_COLUMNS), N_BASE_FEATURES)
+
+# (is_night, is_evening, is_morning, is_afternoon) for each hour of the day
+HOUR_FLAGS = tuple(
+    (
+        1 if hour >= 22 or hour <= 6 else 0,
+        1 if 18 <= hour <= 21 else 0,
+        1 if 6 <= hour <= 11 else 0,
+        1 if 12 <= hour <= 17 else 0
+    )
+    for hour in range(24)
+)
+HOUR_FLAG_ARRAY = np.array(HOUR_FLAGS, dtype=np.int64)
+
+# extract_date_features result for a date it can't parse
+DEFAULT_DATE_FEATURES = (0, 1, 1, 0)
+
+@njit(cache=True)
+def _time_feature_values(minutes, hour_flags):
+    """
+    Expand minutes past midnight into TIME_FEATURE_COLUMNS rows
+    
+    Negative minutes mark unparseable times and get extract_time_features' defaults.
+    """
+    values = np.empty((minutes.shape[0], 6), dtype=np.int64)
+    for i in range(minutes.shape[0]):
+        if minutes[i] < 0:
+            values[i, 0] = 12
+            values[i, 1:] = 0
+            continue
+        hour = minutes[i] // 60
+        values[i, 0] = hour
+        values[i, 1] = minutes[i] % 60
+        values[i, 2:] = hour_flags[hour]
+    return values
+
+def _fast_hhmm_to_minutes(time_str):
+    """Minutes past midnight for a zero-padded 'HH:MM' string, or None if it isn't one"""
+    if type(time_str) is not str or len(time_str) != 5 or time_str[2] != ':' or not time_str.isascii():
+        return None
+    
+    h1 = ord(time_str[0]) - 48
+    h0 = ord(time_str[1]) - 48
+    m1 = ord(time_str[3]) - 48
+    m0 = ord(time_str[4]) - 48
+    if not (0 <= h1 <= 9 and 0 <= h0 <= 9 and 0 <= m1 <= 9 and 0 <= m0 <= 9):
+        return None
+    
+    hour = h1 * 10 + h0
+    minute = m1 * 10 + m0
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+def _time_to_minutes(time_str):
+    """Minutes past midnight for time_str as extract_time_features parses it, or -1 if it can't"""
+    minutes = _fast_hhmm_to_minutes(time_str)
+    if minutes is not None:
+        return minutes
+    try:
+        time_obj = datetime.strptime(time_str, '%H:%M')
+    except:
+        return -1
+    return time_obj.hour * 60 + time_obj.minute
 
 class CrimeDataPreprocessor:
     def __init__(self):
         self.label_encoders = {}
         self.scaler = StandardScaler()
         self.is_fitted = False
+        self._category_codes = {}
+        self._scaler_mean = None
+        self._scaler_scale = None
+        self._encoded_columns = ()
+        self._date_cache = (None, None)
         
     def extract_time_features(self, time_str):
         """Extract time-based features from time string"""
         try:
-            time_obj = datetime.strptime(time_str, '%H:%M')
-            hour = time_obj.hour
-            minute = time_obj.minute
+            # Requests almost always send zero-padded HH:MM; strptime handles the rest
+            minutes = _fast_hhmm_to_minutes(time_str)
+            if minutes is not None:
+                hour, minute = divmod(minutes, 60)
+            else:
+                time_obj = datetime.strptime(time_str, '%H:%M')
+                hour = time_obj.hour
+                minute = time_obj.minute
             
             # Create time-based features
-            is_night = 1 if hour >= 22 or hour <= 6 else 0
-            is_evening = 1 if 18 <= hour <= 21 else 0
-            is_morning = 1 if 6 <= hour <= 11 else 0
-            is_afternoon = 1 if 12 <= hour <= 17 else 0
+            is_night, is_evening, is_morning, is_afternoon = HOUR_FLAGS[hour]
             
             return {
                 'hour': hour,
@@ -91,12 +186,10 @@ class CrimeDataPreprocessor:
         risk_labels = self.create_risk_labels(df)
         
         # Extract time features
-        time_features = df['Time'].apply(self.extract_time_features)
-        time_df = pd.DataFrame(time_features.tolist())
+        time_df = self._time_feature_frame(df['Time'])
         
         # Extract date features
-        date_features = df['Date'].apply(self.extract_date_features)
-        date_df = pd.DataFrame(date_features.tolist())
+        date_df = self._date_feature_frame(df['Date'])
         
         # Prepare features for encoding
         features_to_encode = ['Crime_Type', 'Police_Station']
@@ -132,6 +225,7 @@ class CrimeDataPreprocessor:
         feature_df[numerical_features] = self.scaler.fit_transform(feature_df[numerical_features])
         
         self.is_fitted = True
+        self._build_fast_path()
         
         return feature_df, risk_labels
     
@@ -141,23 +235,26 @@ class CrimeDataPreprocessor:
             raise ValueError("Preprocessor must be fitted before transform")
         
         # Extract time features
-        time_features = df['Time'].apply(self.extract_time_features)
-        time_df = pd.DataFrame(time_features.tolist())
+        time_df = self._time_feature_frame(df['Time'])
         
         # Extract date features
-        date_features = df['Date'].apply(self.extract_date_features)
-        date_df = pd.DataFrame(date_features.tolist())
+        date_df = self._date_feature_frame(df['Date'])
         
         # Encode categorical features
         encoded_features = {}
         for feature, encoder in self.label_encoders.items():
             if feature in df.columns:
-                # Handle unseen categories by using a default value
-                try:
-                    encoded_features[f'encoded_{feature}'] = encoder.transform(df[feature])
-                except:
+                # Same codes as encoder.transform, looked up in the fitted category dict
+                codes = df[feature].map(self._category_codes[feature])
+                if codes.isna().any():
                     # For unseen categories, use the most common category
                     encoded_features[f'encoded_{feature}'] = [0] * len(df)
+                else:
+                    encoded_features[f'encoded_{feature}'] = codes.to_numpy(dtype=np.int64)
+            elif feature == 'Police_Station':
+                # Prediction inputs have no police station; encode it as unknown
+                code = self._category_codes[feature].get(UNKNOWN_POLICE_STATION, 0)
+                encoded_features[f'encoded_{feature}'] = [code] * len(df)
         
         # Combine all features
         feature_df = pd.DataFrame({
@@ -183,6 +280,160 @@ class CrimeDataPreprocessor:
         
         return feature_df
     
+    def _time_feature_frame(self, times):
+        """
+        Time features for a column of time strings, as extract_time_features gives them
+        
+        Each distinct string is parsed once; expanding the parsed minutes into
+        feature rows is done by a compiled kernel.
+        """
+        codes, uniques = pd.factorize(times)
+        # Missing values get code -1, which picks the trailing unparseable marker
+        unique_minutes = np.array([_time_to_minutes(time_str) for time_str in uniques] + [-1], dtype=np.int64)
+        values = _time_feature_values(unique_minutes[codes], HOUR_FLAG_ARRAY)
+        return pd.DataFrame(values, columns=TIME_FEATURE_COLUMNS)
+    
+    def _date_feature_frame(self, dates):
+        """Date features for a column of date strings, parsing each distinct date once"""
+        codes, uniques = pd.factorize(dates)
+        unique_values = [
+            [features[column] for column in DATE_FEATURE_COLUMNS]
+            for features in map(self.extract_date_features, uniques)
+        ]
+        unique_values.append(list(DEFAULT_DATE_FEATURES))
+        values = np.array(unique_values, dtype=np.int64)[codes]
+        return pd.DataFrame(values, columns=DATE_FEATURE_COLUMNS)
+    
+    def _build_fast_path(self):
+        """Cache fitted encoder and scaler parameters as plain lookups for transform_one"""
+        self._category_codes = {
+            feature: {value: code for code, value in enumerate(encoder.classes_)}
+            for feature, encoder in self.label_encoders.items()
+        }
+        self._scaler_mean = np.asarray(self.scaler.mean_, dtype=np.float64)
+        self._scaler_scale = np.asarray(self.scaler.scale_, dtype=np.float64)
+        
+        # (column, crime type codes, constant) per encoder: only Crime_Type comes
+        # from the request, the police station is always UNKNOWN_POLICE_STATION
+        encoded_columns = []
+        for offset, feature in enumerate(self.label_encoders):
+            if feature == 'Crime_Type':
+                encoded_columns.append((N_BASE_FEATURES + offset, self._category_codes[feature], 0))
+            elif feature == 'Police_Station':
+                encoded_columns.append((N_BASE_FEATURES + offset, None, self._category_codes[feature].get(UNKNOWN_POLICE_STATION, 0)))
+            else:
+                encoded_columns.append((N_BASE_FEATURES + offset, None, 0))
+        self._encoded_columns = tuple(encoded_columns)
+        self._date_cache = (None, None)
+    
+    def _date_feature_values(self, date_str):
+        """
+        Get the scaled day_of_week, month and day plus is_weekend for date_str
+        
+        Requests share today's date, so the last result is reused until it changes.
+        """
+        cached_date, date_values = self._date_cache
+        if cached_date != date_str:
+            date_features = self.extract_date_features(date_str)
+            mean = self._scaler_mean
+            scale = self._scaler_scale
+            date_values = (
+                (date_features['day_of_week'] - mean[5]) / scale[5],
+                (date_features['month'] - mean[6]) / scale[6],
+                (date_features['day'] - mean[7]) / scale[7],
+                date_features['is_weekend']
+            )
+            self._date_cache = (date_str, date_values)
+        return date_values
+    
+    def transform_many(self, latitudes, longitudes, time_strs, severities, crime_types, date_str):
+        """
+        Transform a batch of prediction requests without building a DataFrame
+        
+        The batch counterpart of transform_one: all rows share date_str and
+        the police station is encoded as UNKNOWN_POLICE_STATION. Each unseen
+        crime type is encoded as 0 on its own row. Returns a new
+        (n_rows, n_features) float32 array.
+        """
+        if not self.is_fitted:
+            raise ValueError("Preprocessor must be fitted before transform")
+        
+        # Parse each distinct time once; batches tend to repeat times
+        parsed_times = {}
+        for time_str in time_strs:
+            if time_str not in parsed_times:
+                time_features = self.extract_time_features(time_str)
+                parsed_times[time_str] = (
+                    time_features['hour'], time_features['minute'],
+                    time_features['is_night'], time_features['is_evening'],
+                    time_features['is_morning'], time_features['is_afternoon']
+                )
+        time_values = np.array([parsed_times[time_str] for time_str in time_strs],
+                               dtype=np.float64).reshape(len(time_strs), 6)
+        
+        mean = self._scaler_mean
+        scale = self._scaler_scale
+        
+        features = np.empty((len(time_strs), N_BASE_FEATURES + len(self.label_encoders)), dtype=np.float32)
+        features[:, 0] = (np.asarray(latitudes, dtype=np.float64) - mean[0]) / scale[0]
+        features[:, 1] = (np.asarray(longitudes, dtype=np.float64) - mean[1]) / scale[1]
+        features[:, 2] = (np.asarray(severities, dtype=np.float64) - mean[2]) / scale[2]
+        features[:, 3] = (time_values[:, 0] - mean[3]) / scale[3]
+        features[:, 4] = (time_values[:, 1] - mean[4]) / scale[4]
+        features[:, 5:9] = time_values[:, 2:6]
+        features[:, DATE_FEATURE_SLICE] = self._date_feature_values(date_str)
+        
+        for column, codes, constant in self._encoded_columns:
+            if codes is None:
+                features[:, column] = constant
+            else:
+                features[:, column] = [codes.get(crime_type, 0) for crime_type in crime_types]
+        
+        return features
+    
+    def transform_one(self, latitude, longitude, time_str, severity, crime_type, date_str):
+        """
+        Transform a single prediction request without building a DataFrame
+        
+        Only the fields that influence the features are taken; the police
+        station is encoded as UNKNOWN_POLICE_STATION, exactly as transform()
+        does for a frame without one. The returned (1, n_features) float32
+        array is a per-thread buffer that is overwritten by the next call on
+        the same thread.
+        """
+        if not self.is_fitted:
+            raise ValueError("Preprocessor must be fitted before transform")
+        
+        time_features = self.extract_time_features(time_str)
+        
+        # Numerical features scaled exactly as transform() does
+        mean = self._scaler_mean
+        scale = self._scaler_scale
+        
+        n_features = N_BASE_FEATURES + len(self.label_encoders)
+        row = getattr(_thread_local, 'row', None)
+        if row is None or row.shape[1] != n_features:
+            row = np.empty((1, n_features), dtype=np.float32)
+            _thread_local.row = row
+        values = row[0]
+        
+        values[0] = (latitude - mean[0]) / scale[0]
+        values[1] = (longitude - mean[1]) / scale[1]
+        values[2] = (severity - mean[2]) / scale[2]
+        values[3] = (time_features['hour'] - mean[3]) / scale[3]
+        values[4] = (time_features['minute'] - mean[4]) / scale[4]
+        values[5] = time_features['is_night']
+        values[6] = time_features['is_evening']
+        values[7] = time_features['is_morning']
+        values[8] = time_features['is_afternoon']
+        values[DATE_FEATURE_SLICE] = self._date_feature_values(date_str)
+        
+        # Unseen crime types fall back to 0, matching transform()
+        for column, codes, constant in self._encoded_columns:
+            values[column] = constant if codes is None else codes.get(crime_type, 0)
+        
+        return row
+    
     def save_preprocessor(self, filepath):
         """Save the fitted preprocessor"""
         preprocessor_data = {
@@ -190,25 +441,30 @@ class CrimeDataPreprocessor:
             'scaler': self.scaler,
             'is_fitted': self.is_fitted
         }
-        joblib.dump(preprocessor_data, filepath)
+        with atomic_write(filepath) as tmp_path:
+            joblib.dump(preprocessor_data, tmp_path, compress=0, protocol=5)
         print(f"Preprocessor saved to {filepath}")
     
     def load_preprocessor(self, filepath):
         """Load a fitted preprocessor"""
-        if os.path.exists(filepath):
+        try:
             preprocessor_data = joblib.load(filepath)
-            self.label_encoders = preprocessor_data['label_encoders']
-            self.scaler = preprocessor_data['scaler']
-            self.is_fitted = preprocessor_data['is_fitted']
-            print(f"Preprocessor loaded from {filepath}")
-        else:
+        except FileNotFoundError:
             print(f"Preprocessor file not found at {filepath}")
+            return
+        
+        self.label_encoders = preprocessor_data['label_encoders']
+        self.scaler = preprocessor_data['scaler']
+        self.is_fitted = preprocessor_data['is_fitted']
+        if self.is_fitted:
+            self._build_fast_path()
+        print(f"Preprocessor loaded from {filepath}")
     
     def get_feature_names(self):
         """Get the names of all features used in the model"""
         base_features = ['Latitude', 'Longitude', 'Severity']
-        time_features = ['hour', 'minute', 'is_night', 'is_evening', 'is_morning', 'is_afternoon']
-        date_features = ['day_of_week', 'month', 'day', 'is_weekend']
+        time_features = list(TIME_FEATURE_COLUMNS)
+        date_features = list(DATE_FEATURE_COLUMNS)
         encoded_features = [f'encoded_{feature}' for feature in self.label_encoders.keys()]
         
         return base_features + time_features + date_features + encoded_features 
\ No newline at end of file